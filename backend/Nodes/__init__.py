@@ -0,0 +1,3 @@
+"""
+Nodes - node storage, options and prompt processing for Avesia
+"""
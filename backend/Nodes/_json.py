@@ -0,0 +1,64 @@
+"""
+JSON helpers shared by the backend - orjson when it is installed, json otherwise
+Both backends produce the same compact UTF-8 output, so callers never branch on orjson.
+"""
+
+import json
+import os
+from typing import Any, Union
+
+try:
+    import orjson  # Optional fast JSON backend
+except ImportError:
+    orjson = None
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or UTF-8 bytes (orjson's errors subclass json.JSONDecodeError)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize data as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def to_json_bytes(data: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize data as UTF-8 JSON bytes.
+
+    Output is compact unless pretty=True - indent only what a person will read.
+    sort_keys=True gives canonical output, e.g. for use as a cache key.
+    """
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if pretty else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(data, option=option)
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2, sort_keys=sort_keys).encode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys).encode()
+
+
+def read_json(path: str) -> Any:
+    """Read a JSON file"""
+    with open(path, 'rb') as f:
+        return loads_json(f.read())
+
+
+def write_json(path: str, data: Any):
+    """Write data to a file as indented JSON"""
+    with open(path, 'wb') as f:
+        f.write(to_json_bytes(data, pretty=True))
+
+
+def write_json_atomic(path: str, data: Any):
+    """Write data as indented JSON through a synced temp file and a rename -
+    a crash leaves either the old file or the new one, never a torn one"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(to_json_bytes(data, pretty=True))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
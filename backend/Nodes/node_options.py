@@ -1,11 +1,13 @@
 """
 Node Options - Centralized list of dropdown options for different node types
+
+Each OPTIONS tuple keeps the display order; OPTIONS_SET is for membership checks.
 """
 
 
 class ConditionOptions:
     """Available condition type options"""
-    OPTIONS = [
+    OPTIONS = (
         "weather: rain/snow/fog",
         "lighting: day/night/low-light",
         "time",
@@ -13,12 +15,13 @@ class ConditionOptions:
         "duration",
         "frequency",
         "custom",
-    ]
+    )
+    OPTIONS_SET = frozenset(OPTIONS)
 
 
 class ListenerOptions:
     """Available listener type options"""
-    OPTIONS = [
+    OPTIONS = (
         "object (person, car, animal, package)",
         "activity (walking, running, fighting)",
         "motion",
@@ -27,23 +30,26 @@ class ListenerOptions:
         "gesture (hands up, waving)",
         "custom_prompt (natural language)",
         "custom",
-    ]
+    )
+    OPTIONS_SET = frozenset(OPTIONS)
 
 
 class EventOptions:
     """Available event type options (if needed in the future)"""
-    OPTIONS = [
+    OPTIONS = (
         "Email", "Text", "Emergency"
-    ]
+    )
+    OPTIONS_SET = frozenset(OPTIONS)
 
 
 class AccessoryOptions:
     """Available accessory type options"""
-    OPTIONS = [
+    OPTIONS = (
         "Smart Light Bulb",
         "Smart Plug",
         "Motion Sensor",
         "Smart Switch",
         "Smart Lock",
         "Smart Thermostat",
-    ]
+    )
+    OPTIONS_SET = frozenset(OPTIONS)
@@ -3,91 +3,221 @@ Node Processing Module - Converts listener nodes into prompt strings
 Combines listener goals with their conditions into a single prompt string
 """
 
-import json
-from typing import Dict, List, Any
+import functools
+import itertools
+import logging
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterator, Optional
 
+from pydantic import BaseModel, Field
 
-def process_listeners(listeners_json: Dict[str, Any]) -> Dict[str, Any]:
+from ._json import loads_json, to_json_bytes
+
+logger = logging.getLogger(__name__)
+
+# Prompt fragments - interned once at import; each prompt shape is assembled with a
+# single "".join so the final string is allocated at its exact length
+_PROMPT_PREFIX: str = sys.intern("if ")
+_PROMPT_SUFFIX: str = sys.intern(" return true, otherwise false")
+_PROMPT_SUFFIX_WITH_CONDITIONS: str = sys.intern(" return true, otherwise false. Conditions: ")
+_CONDITIONS_SEPARATOR: str = sys.intern(", ")
+_DEFAULT_GOAL: str = sys.intern("relevant objects or events detected")
+_WS_RE: re.Pattern = re.compile(r"\s+")
+
+# Below this many listeners, process start-up and pickling cost more than they save
+PARALLEL_THRESHOLD: int = 500
+
+
+# Listener schema - pydantic compiles the validator once at import. Validated listeners
+# have every field the prompt builder reads filled in, so no .get() fallbacks are needed.
+class _ConditionData(BaseModel):
+    # Types may be null or missing in stored nodes - read them with `or ""`
+    condition_type: Optional[Any] = None
+    description: str = ""
+
+
+class _Condition(BaseModel):
+    condition_data: _ConditionData = Field(default_factory=_ConditionData)
+
+
+class _ListenerData(BaseModel):
+    listener_type: Optional[Any] = None
+    description: str = ""
+
+
+class _Listener(BaseModel):
+    listener_id: Any = ""
+    listener_data: _ListenerData = Field(default_factory=_ListenerData)
+    conditions: List[_Condition] = Field(default_factory=list)
+
+
+_validate_listener = _Listener.model_validate
+
+
+def _build_node(listener: _Listener) -> Dict[str, Any]:
+    """Build the prompt node for a single validated listener"""
+    listener_id: Any = listener.listener_id
+    listener_data: _ListenerData = listener.listener_data
+    
+    # Extract description from listener - this is the primary prompt
+    listener_description: str = listener_data.description.strip()
+    listener_type: Any = listener_data.listener_type or ""
+    
+    # Use description as the primary prompt (user's intent)
+    # If no description, use a fallback based on listener type
+    goal: str
+    if listener_description:
+        # User provided description - wrap it with conditional structure behind the scenes
+        # User sees: "motion detected"
+        # SDK receives: "if motion detected return true, otherwise false"
+        goal = listener_description
+    elif listener_type and listener_type != "custom":
+        # Fallback: use listener type if no description
+        goal = listener_type.lower()
+    else:
+        # Final fallback
+        goal = _DEFAULT_GOAL
+    
+    # Extract constraints from conditions (these refine the prompt)
+    constraints: List[str] = []
+    append = constraints.append  # bound once, reused per condition
+    for condition in listener.conditions:
+        cond_data: _ConditionData = condition.condition_data
+        cond_type: Any = cond_data.condition_type or ""
+        cond_description: str = cond_data.description.strip()
+        
+        if cond_description:
+            # Use condition description if provided (most specific)
+            append(cond_description)
+        elif cond_type and cond_type != "custom":
+            # Fallback to condition type
+            append(cond_type)
+    
+    # Build the prompt string - use description as primary, conditions as additional context
+    prompt: str
+    if constraints:
+        prompt = "".join((_PROMPT_PREFIX, goal, _PROMPT_SUFFIX_WITH_CONDITIONS,
+                          _CONDITIONS_SEPARATOR.join(constraints)))
+    else:
+        prompt = "".join((_PROMPT_PREFIX, goal, _PROMPT_SUFFIX))
+    
+    # Clean up prompt (remove extra whitespace, newlines)
+    prompt = _WS_RE.sub(" ", prompt).strip()
+    
+    logger.debug("📝 Listener %s: Generated prompt: %s", listener_id, prompt)
+    
+    return {
+        "name": listener_id,
+        "datatype": "boolean",
+        "prompt": prompt
+    }
+
+
+def process_listeners(listeners_json: Dict[str, Any], workers: Optional[int] = None) -> Dict[str, Any]:
     """
     Process listeners by combining listener goals with their conditions into a prompt string.
     
     Args:
         listeners_json: The JSON output from user_nodes.export_all()
+        workers: Number of worker processes to spread large graphs across. Only used
+            when there are more than PARALLEL_THRESHOLD listeners; smaller graphs are
+            always processed in this process.
         
     Returns:
         Processed JSON with prompts in the format:
         {
           "nodes": [
-            {"name": "...", "datatype": "boolean", "prompt": "Goal: ..., Constraints: ..."}
+            {"name": "...", "datatype": "boolean",
+             "prompt": "if <description> return true, otherwise false. Conditions: ..."}
           ]
         }
     """
-    nodes = []
+    listeners = listeners_json.get("listeners", ())
+    if workers and workers > 1 and len(listeners) > PARALLEL_THRESHOLD:
+        nodes = _process_parallel(listeners, workers)
+        logger.info("✅ Processed %d listener nodes across %d workers", len(nodes), workers)
+        return {"nodes": nodes}
     
-    for listener in listeners_json.get("listeners", []):
-        listener_id = listener.get("listener_id", "")
-        listener_data = listener.get("listener_data", {})
-        
-        # Extract description from listener - this is the primary prompt
-        listener_description = listener_data.get("description", "").strip()
-        listener_type = listener_data.get("listener_type", "")
-        listener_name = listener_data.get("name", "")
-        
-        # Use description as the primary prompt (user's intent)
-        # If no description, use a fallback based on listener type
-        if listener_description:
-            # User provided description - wrap it with conditional structure behind the scenes
-            # User sees: "motion detected"
-            # SDK receives: "if motion detected return true, otherwise false"
-            base_prompt = f"if {listener_description} return true, otherwise false"
-        elif listener_type and listener_type != "custom":
-            # Fallback: use listener type if no description
-            base_prompt = f"if {listener_type.lower()} return true, otherwise false"
-        else:
-            # Final fallback
-            base_prompt = "if relevant objects or events detected return true, otherwise false"
-        
-        # Extract constraints from conditions (these refine the prompt)
-        constraints = []
-        for condition in listener.get("conditions", []):
-            cond_data = condition.get("condition_data", {})
-            cond_type = cond_data.get("condition_type", "")
-            cond_description = cond_data.get("description", "").strip()
-            
-            constraint_parts = []
-            if cond_description:
-                # Use condition description if provided (most specific)
-                constraint_parts.append(cond_description)
-            elif cond_type and cond_type != "custom":
-                # Fallback to condition type
-                constraint_parts.append(cond_type)
-            
-            if constraint_parts:
-                constraints.append(" ".join(constraint_parts))
-        
-        # Build the prompt string - use description as primary, conditions as additional context
-        if constraints:
-            # Combine base prompt with constraints naturally
-            constraints_text = ", ".join(constraints)
-            prompt = f"{base_prompt}. Conditions: {constraints_text}"
-        else:
-            # Just use the base prompt if no conditions
-            prompt = base_prompt
-        
-        # Clean up prompt (remove extra whitespace, newlines)
-        prompt = " ".join(prompt.split())
-        
-        print(f"📝 Listener {listener_id}: Generated prompt: {prompt}")
-        
-        nodes.append({
-            "name": listener_id,
-            "datatype": "boolean",
-            "prompt": prompt
-        })
+    nodes = _process_cached(listeners_json)
     
     print(f"✅ Processed {len(nodes)} listener nodes")
     return {"nodes": nodes}
 
+
+def process_listeners_iter(listeners_json: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield processed listener nodes one at a time instead of building the whole list.
+
+    Useful for large graphs that are streamed straight into a serializer or
+    HTTP response. Nodes are the same as the ones returned by process_listeners().
+    """
+    for listener in listeners_json.get("listeners", ()):
+        yield _build_node(_validate_listener(listener))
+
+
+def _process_chunk(listeners: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build the nodes for a slice of listeners - runs in a worker process"""
+    return [_build_node(_validate_listener(listener)) for listener in listeners]
+
+
+def _process_parallel(listeners: List[Dict[str, Any]], workers: int) -> List[Dict[str, Any]]:
+    """Split listeners into contiguous chunks and build them in a process pool, keeping order"""
+    listeners = list(listeners)
+    size = -(-len(listeners) // workers)  # ceiling division
+    chunks = [listeners[i:i + size] for i in range(0, len(listeners), size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(itertools.chain.from_iterable(executor.map(_process_chunk, chunks)))
+
+
+def _cache_key(listeners_json: Dict[str, Any]) -> bytes:
+    """Serialize the input to canonical (key-sorted) JSON bytes for use as a cache key"""
+    return to_json_bytes(listeners_json, sort_keys=True)
+
+
+@functools.lru_cache(maxsize=256)
+def _process_listeners_cached(key: bytes) -> tuple:
+    """Build the nodes for a canonical listeners_json key - repeated graphs hit the LRU cache"""
+    return tuple(process_listeners_iter(loads_json(key)))
+
+
+def _process_cached(listeners_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Build the nodes for one payload through the LRU cache"""
+    try:
+        key = _cache_key(listeners_json)
+    except (TypeError, ValueError):
+        # Not JSON-serializable - build without the cache
+        return list(process_listeners_iter(listeners_json))
+    # Hand out copies so callers can't mutate the cached nodes
+    return [dict(node) for node in _process_listeners_cached(key)]
+
+
+def clear_cache() -> None:
+    """Drop all memoized process_listeners() results"""
+    _process_listeners_cached.cache_clear()
+
+
+def process_listeners_batch(batches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Process several listeners_json payloads in one call.
+
+    Each payload goes through the same cache as process_listeners(), so payloads
+    seen before are not rebuilt, and one summary is logged for the whole batch.
+
+    Args:
+        batches: List of JSON outputs from user_nodes.export_all()
+
+    Returns:
+        List of processed JSON payloads, in the same order as the input
+    """
+    results = [{"nodes": _process_cached(listeners_json)} for listeners_json in batches]
+
+    total = sum(len(result["nodes"]) for result in results)
+    logger.info("✅ Processed %d listener nodes across %d payloads", total, len(results))
+    return results
+
+
 if __name__ == "__main__":
     # Test with sample data
     sample_json = {
@@ -165,4 +295,4 @@ if __name__ == "__main__":
 }
     
     result = process_listeners(sample_json)
-    print(json.dumps(result, indent=2))
+    print(to_json_bytes(result, pretty=True).decode())
@@ -0,0 +1,3 @@
+"""
+Nodes Assistant - natural language prompt parsing into node configurations
+"""
@@ -3,23 +3,42 @@ Converter - Converts prompt parser output to UserNodes export format
 Takes the flat structure from Gemini and converts it to the listener-centric format
 """
 
+from __future__ import annotations
+
+import asyncio
+import logging
 import uuid
-import json
-import sys
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, AbstractSet, Callable, Iterator, List, Tuple
+
+from .._json import to_json_bytes
+from ..node_options import ConditionOptions, ListenerOptions, EventOptions, AccessoryOptions
+
+logger = logging.getLogger(__name__)
 
-# Add parent directory to path to import node_options
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from node_options import ConditionOptions, ListenerOptions, EventOptions, AccessoryOptions
+def _mint_ids(n: int) -> List[str]:
+    """Generate n random (version 4) UUID strings from a single os.urandom call"""
+    raw: bytes = os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
+
+def _count_missing_ids(listeners: List[Dict[str, Any]]) -> int:
+    """Count the listeners, conditions, events and accessories that arrived without an ID"""
+    missing: int = 0
+    for listener in listeners:
+        missing += not listener.get("listener_id")
+        missing += sum(not item.get("condition_id") for item in listener.get("conditions", []))
+        missing += sum(not item.get("event_id") for item in listener.get("events", []))
+        missing += sum(not item.get("accessory_id") for item in listener.get("accessories", []))
+    return missing
 
 
-def validate_and_correct_type(value: str, valid_options: List[str], field_name: str) -> str:
+def validate_and_correct_type(value: str, valid_options: AbstractSet[str], field_name: str) -> str:
     """Validate if a type value is in the valid options list, otherwise return 'custom'.
     
     Args:
         value: The type value to validate
-        valid_options: List of valid options from node_options.py
+        valid_options: Valid options from node_options.py - the OPTIONS_SET frozenset
         field_name: Name of the field for logging purposes
         
     Returns:
@@ -28,10 +47,190 @@ def validate_and_correct_type(value: str, valid_options: List[str], field_name:
     if value in valid_options:
         return value
     else:
-        print(f"⚠️  Invalid {field_name}: '{value}' not in options. Changing to 'custom'.")
+        logger.warning("⚠️  Invalid %s: '%s' not in options. Changing to 'custom'.", field_name, value)
         return "custom"
 
 
+# Bound membership tests for the hot path - valid values are checked inline and
+# only invalid ones go through validate_and_correct_type (which logs the correction)
+_is_listener_type: Callable[[object], bool] = ListenerOptions.OPTIONS_SET.__contains__
+_is_condition_type: Callable[[object], bool] = ConditionOptions.OPTIONS_SET.__contains__
+_is_event_type: Callable[[object], bool] = EventOptions.OPTIONS_SET.__contains__
+_is_accessory_type: Callable[[object], bool] = AccessoryOptions.OPTIONS_SET.__contains__
+
+_LISTENER_KEYS: Tuple[str, ...] = ("listener_id", "listener_data", "conditions", "events", "accessories")
+_CONDITION_KEYS: Tuple[str, ...] = ("condition_id", "condition_data")
+_EVENT_KEYS: Tuple[str, ...] = ("event_id", "event_data")
+_ACCESSORY_KEYS: Tuple[str, ...] = ("accessory_id", "accessory_data")
+_EVENT_TEXT_FIELDS: Tuple[str, ...] = ("message", "recipient", "number", "description")
+
+
+def _is_stripped(value: Any) -> bool:
+    return isinstance(value, str) and value == value.strip()
+
+
+def _condition_ready(condition: Dict[str, Any]) -> bool:
+    data = condition["condition_data"]
+    return (
+        bool(condition["condition_id"])
+        and bool(data.get("name"))
+        and _is_condition_type(data.get("condition_type"))
+        and _is_stripped(data.get("description"))
+    )
+
+
+def _event_ready(event: Dict[str, Any]) -> bool:
+    data = event["event_data"]
+    return (
+        bool(event["event_id"])
+        and bool(data.get("name"))
+        and _is_event_type(data.get("event_type"))
+        and bool(data.get("action"))
+        and all(field in data for field in _EVENT_TEXT_FIELDS)
+    )
+
+
+def _accessory_ready(accessory: Dict[str, Any]) -> bool:
+    data = accessory["accessory_data"]
+    return (
+        bool(accessory["accessory_id"])
+        and bool(data.get("name"))
+        and _is_accessory_type(data.get("accessory_type"))
+    )
+
+
+def _listener_ready(listener: Dict[str, Any]) -> bool:
+    """True when converting the listener would leave it exactly as it is"""
+    if tuple(listener) != _LISTENER_KEYS or not listener["listener_id"]:
+        return False
+    data = listener["listener_data"]
+    return (
+        bool(data)
+        and _is_stripped(data.get("description"))
+        and ("listener_type" not in data or _is_listener_type(data["listener_type"]))
+        and all(tuple(c) == _CONDITION_KEYS and _condition_ready(c) for c in listener["conditions"])
+        and all(tuple(e) == _EVENT_KEYS and _event_ready(e) for e in listener["events"])
+        and all(tuple(a) == _ACCESSORY_KEYS and _accessory_ready(a) for a in listener["accessories"])
+    )
+
+
+def _build_condition(condition: Dict[str, Any], new_ids: Iterator[str]) -> Dict[str, Any]:
+    """Fill in defaults and validate a single condition"""
+    condition_id: str = condition.get("condition_id") or next(new_ids)
+    condition_data: Dict[str, Any] = condition.get("condition_data", {})
+    
+    # Ensure required fields in condition_data
+    if not condition_data.get("name"):
+        condition_data["name"] = "unnamed_condition"
+    # Validate condition_type, or default it to "custom" without a redundant validation
+    condition_type: Any = condition_data.get("condition_type")
+    if not condition_type:
+        condition_data["condition_type"] = "custom"
+    elif not _is_condition_type(condition_type):
+        condition_data["condition_type"] = validate_and_correct_type(
+            condition_type,
+            ConditionOptions.OPTIONS_SET,
+            "condition_type"
+        )
+    condition_data["description"] = (condition_data.get("description") or "").strip()
+    
+    return {
+        "condition_id": condition_id,
+        "condition_data": condition_data
+    }
+
+
+def _build_event(event: Dict[str, Any], new_ids: Iterator[str]) -> Dict[str, Any]:
+    """Fill in defaults and validate a single event"""
+    event_id: str = event.get("event_id") or next(new_ids)
+    event_data: Dict[str, Any] = event.get("event_data", {})
+    
+    # Ensure required fields in event_data
+    if not event_data.get("name"):
+        event_data["name"] = "unnamed_event"
+    # Validate event_type (the "Gmail" default still goes through validation)
+    event_type: Any = event_data.get("event_type") or "Gmail"
+    event_data["event_type"] = event_type if _is_event_type(event_type) else validate_and_correct_type(
+        event_type,
+        EventOptions.OPTIONS_SET,
+        "event_type"
+    )
+    if not event_data.get("action"):
+        event_data["action"] = "notification"
+    
+    # Ensure all event_data fields exist
+    event_data.setdefault("message", "")
+    event_data.setdefault("recipient", "")
+    event_data.setdefault("number", "")
+    event_data.setdefault("description", "")
+    
+    return {
+        "event_id": event_id,
+        "event_data": event_data
+    }
+
+
+def _build_accessory(accessory: Dict[str, Any], new_ids: Iterator[str]) -> Dict[str, Any]:
+    """Fill in defaults and validate a single accessory"""
+    accessory_id: str = accessory.get("accessory_id") or next(new_ids)
+    accessory_data: Dict[str, Any] = accessory.get("accessory_data", {})
+    
+    # Ensure required fields in accessory_data
+    if not accessory_data.get("name"):
+        accessory_data["name"] = "unnamed_accessory"
+    
+    # Validate accessory_type, or default it to the "custom" fallback without validating
+    accessory_type: Any = accessory_data.get("accessory_type")
+    if not accessory_type:
+        accessory_data["accessory_type"] = "custom"
+    elif not _is_accessory_type(accessory_type):
+        accessory_data["accessory_type"] = validate_and_correct_type(
+            accessory_type,
+            AccessoryOptions.OPTIONS_SET,
+            "accessory_type"
+        )
+    
+    return {
+        "accessory_id": accessory_id,
+        "accessory_data": accessory_data
+    }
+
+
+def _build_listener(listener: Dict[str, Any], new_ids: Iterator[str]) -> Dict[str, Any]:
+    """Fill in defaults and validate a listener along with its conditions, events and accessories"""
+    # Ensure all required fields exist with defaults if missing
+    listener_id: str = listener.get("listener_id") or next(new_ids)
+    
+    listener_data: Dict[str, Any] = listener.get("listener_data", {})
+    if not listener_data:
+        listener_data = {
+            "name": "unnamed_listener",
+            "listener_type": "custom",
+            "description": ""
+        }
+    
+    # Normalize the description once here so prompt generation can reuse it as-is
+    listener_data["description"] = (listener_data.get("description") or "").strip()
+    
+    # Validate listener_type when present - a null type is corrected to "custom" too.
+    # Valid types skip validate_and_correct_type, which only exists to log the correction.
+    if "listener_type" in listener_data and not _is_listener_type(listener_data["listener_type"]):
+        listener_data["listener_type"] = validate_and_correct_type(
+            listener_data["listener_type"],
+            ListenerOptions.OPTIONS_SET,
+            "listener_type"
+        )
+    
+    # Conditions, events and accessories are already in the correct format
+    return {
+        "listener_id": listener_id,
+        "listener_data": listener_data,
+        "conditions": [_build_condition(c, new_ids) for c in listener.get("conditions", ())],
+        "events": [_build_event(e, new_ids) for e in listener.get("events", ())],
+        "accessories": [_build_accessory(a, new_ids) for a in listener.get("accessories", ())]
+    }
+
+
 def convert_to_export_format(parsed_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Convert parsed prompt data to all_nodes_export.json format.
@@ -55,125 +254,24 @@ def convert_to_export_format(parsed_data: Dict[str, Any]) -> Dict[str, Any]:
         Dictionary in all_nodes_export.json format (same structure as input since Gemini now returns the correct format)
     """
     
-    listeners_output = []
-    
     # Get listeners from parsed structure
-    listeners = parsed_data.get("listeners", [])
+    listeners: List[Dict[str, Any]] = parsed_data.get("listeners", ())
     
-    # Process each listener (they already have the correct structure from Gemini)
-    for listener in listeners:
-        # Ensure all required fields exist with defaults if missing
-        listener_id = listener.get("listener_id", str(uuid.uuid4()))
-        
-        listener_data = listener.get("listener_data", {})
-        if not listener_data:
-            listener_data = {
-                "name": "unnamed_listener",
-                "listener_type": "custom",
-                "description": ""
-            }
-        
-        # Validate listener_type
-        if "listener_type" in listener_data:
-            listener_data["listener_type"] = validate_and_correct_type(
-                listener_data["listener_type"],
-                ListenerOptions.OPTIONS,
-                "listener_type"
-            )
-        
-        # Process conditions (already in correct format)
-        conditions_array = []
-        for condition in listener.get("conditions", []):
-            condition_id = condition.get("condition_id", str(uuid.uuid4()))
-            condition_data = condition.get("condition_data", {})
-            
-            # Ensure required fields in condition_data
-            if not condition_data.get("name"):
-                condition_data["name"] = "unnamed_condition"
-            if not condition_data.get("condition_type"):
-                condition_data["condition_type"] = "custom"
-            
-            # Validate condition_type
-            if "condition_type" in condition_data:
-                condition_data["condition_type"] = validate_and_correct_type(
-                    condition_data["condition_type"],
-                    ConditionOptions.OPTIONS,
-                    "condition_type"
-                )
-            
-            conditions_array.append({
-                "condition_id": condition_id,
-                "condition_data": condition_data
-            })
-        
-        # Process events (already in correct format)
-        events_array = []
-        for event in listener.get("events", []):
-            event_id = event.get("event_id", str(uuid.uuid4()))
-            event_data = event.get("event_data", {})
-            
-            # Ensure required fields in event_data
-            if not event_data.get("name"):
-                event_data["name"] = "unnamed_event"
-            if not event_data.get("event_type"):
-                event_data["event_type"] = "Gmail"
-            if not event_data.get("action"):
-                event_data["action"] = "notification"
-            
-            # Validate event_type
-            if "event_type" in event_data:
-                event_data["event_type"] = validate_and_correct_type(
-                    event_data["event_type"],
-                    EventOptions.OPTIONS,
-                    "event_type"
-                )
-            
-            # Ensure all event_data fields exist
-            event_data.setdefault("message", "")
-            event_data.setdefault("recipient", "")
-            event_data.setdefault("number", "")
-            event_data.setdefault("description", "")
-            
-            events_array.append({
-                "event_id": event_id,
-                "event_data": event_data
-            })
-        
-        # Process accessories (already in correct format)
-        accessories_array = []
-        for accessory in listener.get("accessories", []):
-            accessory_id = accessory.get("accessory_id", str(uuid.uuid4()))
-            accessory_data = accessory.get("accessory_data", {})
-            
-            # Ensure required fields in accessory_data
-            if not accessory_data.get("name"):
-                accessory_data["name"] = "unnamed_accessory"
-            if not accessory_data.get("accessory_type"):
-                accessory_data["accessory_type"] = "custom"
-            
-            # Validate accessory_type
-            if "accessory_type" in accessory_data:
-                accessory_data["accessory_type"] = validate_and_correct_type(
-                    accessory_data["accessory_type"],
-                    AccessoryOptions.OPTIONS,
-                    "accessory_type"
-                )
-            
-            accessories_array.append({
-                "accessory_id": accessory_id,
-                "accessory_data": accessory_data
-            })
-        
-        # Build complete listener object
-        listener_obj = {
-            "listener_id": listener_id,
-            "listener_data": listener_data,
-            "conditions": conditions_array,
-            "events": events_array,
-            "accessories": accessories_array
+    # Fast path - Gemini usually returns the export format already, with every ID
+    # present and every type valid. Then there is nothing to fill in or correct,
+    # so reuse the listeners as they are.
+    if all(_listener_ready(listener) for listener in listeners):
+        return {
+            "listeners": list(listeners),
+            "total_listeners": len(listeners)
         }
-        
-        listeners_output.append(listener_obj)
+    
+    # Mint every missing ID up front in one batch
+    new_ids: Iterator[str] = iter(_mint_ids(_count_missing_ids(listeners)))
+    
+    # Process each listener (they already have the correct structure from Gemini).
+    # Converting in order hands out the minted IDs deterministically.
+    listeners_output: List[Dict[str, Any]] = [_build_listener(listener, new_ids) for listener in listeners]
     
     # Build final export structure
     export_data = {
@@ -194,23 +292,63 @@ def parse_and_convert(user_prompt: str) -> Dict[str, Any]:
     Returns:
         Dictionary in all_nodes_export.json format
     """
-    from prompt_parser import parse_prompt
+    from .prompt_parser import parse_prompt
     
-    print("🔄 Parsing prompt with Gemini...")
+    logger.info("🔄 Parsing prompt with Gemini...")
     parsed_data = parse_prompt(user_prompt)
     
-    print("🔄 Converting to export format...")
+    logger.info("🔄 Converting to export format...")
     export_data = convert_to_export_format(parsed_data)
     
-    print(f"✅ Conversion complete!")
-    print(f"   Created {export_data['total_listeners']} listener(s)")
+    logger.info("✅ Conversion complete! Created %d listener(s)", export_data['total_listeners'])
     
     return export_data
 
 
+async def parse_and_convert_async(user_prompt: str) -> Dict[str, Any]:
+    """
+    Async version of parse_and_convert - awaits the Gemini call instead of blocking on it.
+    
+    Args:
+        user_prompt: Natural language automation description
+        
+    Returns:
+        Dictionary in all_nodes_export.json format
+    """
+    from .prompt_parser import parse_prompt_async
+    
+    parsed_data = await parse_prompt_async(user_prompt)
+    return convert_to_export_format(parsed_data)
+
+
+async def parse_prompts_batch(prompts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parse and convert several prompts concurrently.
+    
+    The Gemini round-trips overlap, so N prompts take roughly as long as the slowest one.
+    
+    Args:
+        prompts: Natural language automation descriptions
+        
+    Returns:
+        List of export format dictionaries, in the same order as the prompts
+    """
+    logger.info("🔄 Parsing %d prompts with Gemini...", len(prompts))
+    results = await asyncio.gather(*(parse_and_convert_async(prompt) for prompt in prompts))
+    logger.info("✅ Converted %d prompts", len(results))
+    return list(results)
+
+
+def parse_and_convert_batch(prompts: List[str]) -> List[Dict[str, Any]]:
+    """Synchronous wrapper around parse_prompts_batch for callers without an event loop"""
+    return asyncio.run(parse_prompts_batch(prompts))
+
+
 if __name__ == "__main__":
     import sys
     
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("="*70)
     print("PROMPT TO EXPORT FORMAT CONVERTER")
     print("="*70)
@@ -229,12 +367,12 @@ if __name__ == "__main__":
             result = parse_and_convert(prompt)
             
             print("\n📋 EXPORT FORMAT RESULT:")
-            print(json.dumps(result, indent=2))
+            print(to_json_bytes(result, pretty=True).decode())
             
             # Save to file
             output_file = f"converted_export_{i}.json"
-            with open(output_file, 'w') as f:
-                json.dump(result, f, indent=2)
+            with open(output_file, 'wb') as f:
+                f.write(to_json_bytes(result))
             print(f"\n💾 Saved to: {output_file}")
             
         except Exception as e:
@@ -248,14 +386,14 @@ if __name__ == "__main__":
     print("You can also use this programmatically:")
     print("="*70)
     print("""
-from nodes_assistant.converter import parse_and_convert
+from Nodes.nodes_assistant.converter import parse_and_convert
 
 # Parse and convert in one step
 result = parse_and_convert("Alert me when someone is at the door")
 
 # Or convert existing parsed data
-from nodes_assistant.converter import convert_to_export_format
-from nodes_assistant.prompt_parser import parse_prompt
+from Nodes.nodes_assistant.converter import convert_to_export_format
+from Nodes.nodes_assistant.prompt_parser import parse_prompt
 
 parsed = parse_prompt("Your prompt here")
 export_format = convert_to_export_format(parsed)
@@ -0,0 +1,62 @@
+"""
+Export Models - Pydantic models for the listener-centric node configuration
+Passed to Gemini as the response schema so it returns typed JSON directly
+"""
+
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ConditionData(BaseModel):
+    name: str = "unnamed_condition"
+    condition_type: str = "custom"
+    description: str = ""
+
+
+class Condition(BaseModel):
+    condition_id: str = ""
+    condition_data: ConditionData = Field(default_factory=ConditionData)
+
+
+class EventData(BaseModel):
+    name: str = "unnamed_event"
+    event_type: str = "Gmail"
+    action: str = "notification"
+    message: str = ""
+    recipient: str = ""
+    number: str = ""
+    description: str = ""
+
+
+class Event(BaseModel):
+    event_id: str = ""
+    event_data: EventData = Field(default_factory=EventData)
+
+
+class AccessoryData(BaseModel):
+    name: str = "unnamed_accessory"
+    accessory_type: str = "custom"
+
+
+class Accessory(BaseModel):
+    accessory_id: str = ""
+    accessory_data: AccessoryData = Field(default_factory=AccessoryData)
+
+
+class ListenerData(BaseModel):
+    name: str = "unnamed_listener"
+    listener_type: str = "custom"
+    description: str = ""
+
+
+class Listener(BaseModel):
+    listener_id: str = ""
+    listener_data: ListenerData = Field(default_factory=ListenerData)
+    conditions: List[Condition] = Field(default_factory=list)
+    events: List[Event] = Field(default_factory=list)
+    accessories: List[Accessory] = Field(default_factory=list)
+
+
+class NodesExport(BaseModel):
+    """Top-level structure returned by the prompt parser"""
+    listeners: List[Listener] = Field(default_factory=list)
@@ -4,25 +4,54 @@ Takes user input and returns structured JSON for listener, conditions, and event
 """
 
 import os
+import re
+import copy
 import json
-from typing import Dict, Any
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+import httpx
 from google import genai
+from google.genai import types
 from dotenv import load_dotenv
-import sys
+from pydantic import ValidationError
 
-# Add parent directory to path to import node_options
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from node_options import ConditionOptions, ListenerOptions, EventOptions, AccessoryOptions
+try:
+    import h2  # noqa: F401 - optional, enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from .._json import loads_json, to_json_bytes
+from ..node_options import ConditionOptions, ListenerOptions, EventOptions, AccessoryOptions
+from .export_models import NodesExport
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Keep-alive pool shared by every request from this process, so calls after the
+# first reuse an open TLS connection instead of handshaking again
+_HTTP_CLIENT_ARGS: Dict[str, Any] = {
+    "limits": httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60.0),
+    "http2": HTTP2_AVAILABLE,
+}
+
 # Configure Gemini API
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if GEMINI_API_KEY:
-    client = genai.Client(api_key=GEMINI_API_KEY)
+    client = genai.Client(
+        api_key=GEMINI_API_KEY,
+        http_options=types.HttpOptions(
+            client_args=_HTTP_CLIENT_ARGS,
+            async_client_args=_HTTP_CLIENT_ARGS,
+        ),
+    )
 else:
     client = None
-    print("⚠️  Warning: GEMINI_API_KEY not found in environment variables")
+    logger.warning("⚠️  Warning: GEMINI_API_KEY not found in environment variables")
 
 
 SYSTEM_PROMPT = f"""You are a smart assistant that converts natural language automation requests into structured node configurations.
@@ -216,6 +245,143 @@ Output:
 Now parse the user's input and return ONLY the JSON output."""
 
 
+GEMINI_MODEL = 'models/gemini-2.5-flash'
+
+# Structured output - Gemini returns JSON matching NodesExport, which the SDK
+# parses into the model for us (response.parsed)
+GENERATION_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=NodesExport,
+)
+
+# Leading ```json / ``` and trailing ``` fences around the (already stripped) response
+_FENCE_RE = re.compile(r"\A```(?:json)?|```\Z")
+
+
+# Parsed results of recent prompts - identical prompts skip the Gemini call entirely
+RESPONSE_CACHE_SIZE = 256
+_response_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _get_cached_response(user_prompt: str) -> Optional[Dict[str, Any]]:
+    """Return a copy of the cached result for a prompt, or None on a miss"""
+    with _response_cache_lock:
+        result = _response_cache.get(user_prompt)
+        if result is None:
+            return None
+        _response_cache.move_to_end(user_prompt)
+    # Callers (e.g. the converter) mutate the result, so never hand out the cached dict
+    return copy.deepcopy(result)
+
+
+def _cache_response(user_prompt: str, result: Dict[str, Any]) -> None:
+    """Store a copy of a parsed result, evicting the least recently used entry when full"""
+    result = copy.deepcopy(result)
+    with _response_cache_lock:
+        _response_cache[user_prompt] = result
+        _response_cache.move_to_end(user_prompt)
+        if len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+def clear_response_cache() -> None:
+    """Drop all cached Gemini results"""
+    with _response_cache_lock:
+        _response_cache.clear()
+
+
+def _build_contents(user_prompt: str) -> List[str]:
+    """Build the request contents for a user prompt.
+
+    System prompt and user input go as separate parts of one user turn,
+    so the large system prompt is never copied into a per-request string.
+    """
+    return [SYSTEM_PROMPT, f"USER INPUT:\n{user_prompt}"]
+
+
+def _parse_response_text(text: str) -> Dict[str, Any]:
+    """Parse the raw response text as JSON, tolerating markdown code fences.
+
+    Text matching the NodesExport schema comes back with every default filled in.
+    """
+    response_text = text.strip()
+    
+    # Remove markdown code blocks if present
+    response_text = _FENCE_RE.sub("", response_text).strip()
+    
+    # Parse and validate against the export schema in a single pass
+    try:
+        return NodesExport.model_validate_json(response_text).model_dump()
+    except ValidationError:
+        pass  # Not valid JSON, or not the expected shape - fall back to plain parsing
+    
+    # Parse JSON
+    try:
+        return loads_json(response_text)
+    except json.JSONDecodeError as e:
+        logger.error("❌ Failed to parse Gemini response as JSON: %s", e)
+        logger.error("Response was: %s...", response_text[:500])
+        raise
+
+
+def _parse_response(response: Any) -> Dict[str, Any]:
+    """Turn a Gemini response into the parsed node configuration"""
+    parsed = getattr(response, "parsed", None)
+    if isinstance(parsed, NodesExport):
+        # Structured output already validated against the schema
+        result = parsed.model_dump()
+    else:
+        # Fall back to parsing the response text ourselves
+        result = _parse_response_text(response.text)
+    
+    # Validate structure
+    if "listeners" not in result:
+        result["listeners"] = []
+    
+    # Count nested items
+    total_conditions = sum(len(listener.get("conditions", [])) for listener in result["listeners"])
+    total_events = sum(len(listener.get("events", [])) for listener in result["listeners"])
+    total_accessories = sum(len(listener.get("accessories", [])) for listener in result["listeners"])
+    
+    logger.info(
+        "✅ Parsed prompt successfully - Listeners: %d, Conditions: %d, Events: %d, Accessories: %d",
+        len(result['listeners']), total_conditions, total_events, total_accessories
+    )
+    
+    return result
+
+
+def _cached_or_none(user_prompt: str) -> Optional[Dict[str, Any]]:
+    """Check Gemini is configured, then return the cached result for a prompt, or None on a miss"""
+    if not client:
+        raise ValueError("GEMINI_API_KEY not configured. Please set it in your .env file.")
+    
+    cached = _get_cached_response(user_prompt)
+    if cached is not None:
+        logger.info("⚡ Using cached Gemini result for prompt")
+    return cached
+
+
+def _finish(user_prompt: str, response: Any) -> Dict[str, Any]:
+    """Parse a Gemini response and cache the result for the prompt"""
+    result = _parse_response(response)
+    _cache_response(user_prompt, result)
+    return result
+
+
+@contextmanager
+def _log_gemini_errors():
+    """Log errors from the Gemini call or response handling before re-raising them"""
+    try:
+        yield
+    except json.JSONDecodeError:
+        raise  # Already logged along with the response text
+    except Exception as e:
+        logger.error("❌ Error processing with Gemini: %s", e)
+        raise
+
+
 def parse_prompt_with_gemini(user_prompt: str) -> Dict[str, Any]:
     """
     Parse a natural language prompt into structured node configuration.
@@ -226,55 +392,37 @@ def parse_prompt_with_gemini(user_prompt: str) -> Dict[str, Any]:
     Returns:
         Dictionary with listeners, conditions, and events structure
     """
-    if not client:
-        raise ValueError("GEMINI_API_KEY not configured. Please set it in your .env file.")
+    cached = _cached_or_none(user_prompt)
+    if cached is not None:
+        return cached
     
-    try:
+    with _log_gemini_errors():
         # Send to Gemini
         response = client.models.generate_content(
-            model='models/gemini-2.5-flash',
-            contents=f"{SYSTEM_PROMPT}\n\nUSER INPUT:\n{user_prompt}"
+            model=GEMINI_MODEL,
+            contents=_build_contents(user_prompt),
+            config=GENERATION_CONFIG
         )
-        
-        # Parse response
-        response_text = response.text.strip()
-        
-        # Remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        # Parse JSON
-        result = json.loads(response_text)
-        
-        # Validate structure
-        if "listeners" not in result:
-            result["listeners"] = []
-        
-        # Count nested items
-        total_conditions = sum(len(listener.get("conditions", [])) for listener in result["listeners"])
-        total_events = sum(len(listener.get("events", [])) for listener in result["listeners"])
-        total_accessories = sum(len(listener.get("accessories", [])) for listener in result["listeners"])
-        
-        print(f"✅ Parsed prompt successfully")
-        print(f"   Listeners: {len(result['listeners'])}")
-        print(f"   Conditions: {total_conditions}")
-        print(f"   Events: {total_events}")
-        print(f"   Accessories: {total_accessories}")
-        
-        return result
-        
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse Gemini response as JSON: {e}")
-        print(f"Response was: {response_text[:500]}...")
-        raise
-    except Exception as e:
-        print(f"❌ Error processing with Gemini: {e}")
-        raise
+        return _finish(user_prompt, response)
+
+
+async def parse_prompt_with_gemini_async(user_prompt: str) -> Dict[str, Any]:
+    """
+    Async version of parse_prompt_with_gemini using the client's async API.
+    Lets callers await the Gemini round-trip without blocking the event loop.
+    """
+    cached = _cached_or_none(user_prompt)
+    if cached is not None:
+        return cached
+    
+    with _log_gemini_errors():
+        # Send to Gemini
+        response = await client.aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=_build_contents(user_prompt),
+            config=GENERATION_CONFIG
+        )
+        return _finish(user_prompt, response)
 
 
 def parse_prompt(user_prompt: str) -> Dict[str, Any]:
@@ -285,7 +433,16 @@ def parse_prompt(user_prompt: str) -> Dict[str, Any]:
     return parse_prompt_with_gemini(user_prompt)
 
 
+async def parse_prompt_async(user_prompt: str) -> Dict[str, Any]:
+    """
+    Async alias for parse_prompt_with_gemini_async.
+    """
+    return await parse_prompt_with_gemini_async(user_prompt)
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # Example usage
     print("="*70)
     print("PROMPT PARSER - Natural Language to Node Configuration")
@@ -307,12 +464,12 @@ if __name__ == "__main__":
         try:
             result = parse_prompt(prompt)
             print("\n📋 PARSED RESULT:")
-            print(json.dumps(result, indent=2))
+            print(to_json_bytes(result, pretty=True).decode())
             
             # Save to file
             output_file = f"parsed_prompt_{i}.json"
-            with open(output_file, 'w') as f:
-                json.dump(result, f, indent=2)
+            with open(output_file, 'wb') as f:
+                f.write(to_json_bytes(result))
             print(f"\n💾 Saved to: {output_file}")
             
         except Exception as e:
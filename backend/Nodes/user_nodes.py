@@ -1,15 +1,34 @@
 """
 User Nodes System - Linked List Structure
 Manages conditions -> listeners -> events chain
-Each node is stored as a JSON file with pointers to next nodes
+Each node has pointers to next nodes. Changes are appended to a single log (nodes.log)
+and compacted into one JSON file per node once the log grows large.
 """
 
 import json
+import logging
 import os
+import threading
 import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Dict, List, Optional, Any
 from pathlib import Path
-from node_options import ConditionOptions, ListenerOptions, EventOptions
+from ._json import dumps_json, loads_json, read_json, write_json, write_json_atomic
+from .node_options import ConditionOptions, ListenerOptions, EventOptions
+
+logger = logging.getLogger(__name__)
+
+LOG_FILENAME = "nodes.log"
+# Fold the log into the per-node snapshot files once it grows past this many bytes
+COMPACT_THRESHOLD = 4 * 1024 * 1024
+# Cold loads of more snapshot files than this are read on a thread pool so the
+# reads overlap; below it, thread start-up costs more than it saves
+PARALLEL_LOAD_THRESHOLD = 64
+LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Most unknown IDs remembered by get_node before the negative cache is reset
+MISSING_CACHE_SIZE = 1024
 
 
 class NodeType:
@@ -22,11 +41,16 @@ class NodeType:
 class Node:
     """Base node class representing a single node in the chain"""
     
+    # No per-instance __dict__ - nodes are small and numerous in the cache
+    __slots__ = ("node_id", "node_type", "data", "next_nodes")
+    
     def __init__(self, node_id: str = None, node_type: str = None, data: Dict = None, next_nodes: List[str] = None):
         self.node_id = node_id or str(uuid.uuid4())
         self.node_type = node_type
         self.data = data or {}
-        self.next_nodes = next_nodes or []  # List of node IDs this node points to
+        # IDs of the nodes this node points to - a dict used as an ordered set,
+        # so adding, removing and membership checks are O(1)
+        self.next_nodes: Dict[str, None] = dict.fromkeys(next_nodes) if next_nodes else {}
     
     def to_dict(self) -> Dict:
         """Convert node to dictionary for JSON serialization"""
@@ -34,33 +58,36 @@ class Node:
             "node_id": self.node_id,
             "node_type": self.node_type,
             "data": self.data,
-            "next_nodes": self.next_nodes
+            "next_nodes": list(self.next_nodes)
         }
     
     @staticmethod
     def from_dict(node_dict: Dict) -> 'Node':
         """Create node from dictionary"""
-        return Node(
-            node_id=node_dict.get("node_id"),
-            node_type=node_dict.get("node_type"),
-            data=node_dict.get("data", {}),
-            next_nodes=node_dict.get("next_nodes", [])
-        )
+        # node_id and node_type are always written; data/next_nodes may be missing or null
+        return Node(node_dict["node_id"], node_dict["node_type"],
+                    node_dict.get("data"), node_dict.get("next_nodes"))
+    
+    @staticmethod
+    def from_dict_fast(node_dict: Dict) -> 'Node':
+        """Create node from a dictionary written by to_dict() - all four keys present"""
+        return Node(node_dict["node_id"], node_dict["node_type"],
+                    node_dict["data"], node_dict["next_nodes"])
     
     def add_next_node(self, node_id: str):
         """Add a pointer to the next node"""
-        if node_id not in self.next_nodes:
-            self.next_nodes.append(node_id)
+        self.next_nodes[node_id] = None
     
     def remove_next_node(self, node_id: str):
         """Remove a pointer to a next node"""
-        if node_id in self.next_nodes:
-            self.next_nodes.remove(node_id)
+        self.next_nodes.pop(node_id, None)
 
 
 class ConditionNode(Node):
     """Condition node - points to listener nodes"""
     
+    __slots__ = ()
+    
     def __init__(self, node_id: str = None, data: Dict = None, next_nodes: List[str] = None):
         super().__init__(node_id, NodeType.CONDITION, data, next_nodes)
     
@@ -72,6 +99,8 @@ class ConditionNode(Node):
 class ListenerNode(Node):
     """Listener node - points to event nodes (can share events)"""
     
+    __slots__ = ()
+    
     def __init__(self, node_id: str = None, data: Dict = None, next_nodes: List[str] = None):
         super().__init__(node_id, NodeType.LISTENER, data, next_nodes)
     
@@ -83,10 +112,108 @@ class ListenerNode(Node):
 class EventNode(Node):
     """Event node - terminal node in the chain"""
     
+    __slots__ = ()
+    
     def __init__(self, node_id: str = None, data: Dict = None):
         super().__init__(node_id, NodeType.EVENT, data, next_nodes=[])
 
 
+class _LogWriter:
+    """
+    Write-behind for the mutation log - records are serialized by the caller and
+    written by a background thread, so mutations don't wait on the disk.
+    Holds no reference to its UserNodes, so the store can still be garbage collected.
+    """
+    
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self._log = None  # Opened by the writer thread on first write
+        self._pending: List[bytes] = []
+        self._cv = threading.Condition()
+        self._writing = False
+        self._sync_requested = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._io_lock = threading.Lock()  # Guards self._log between the writer thread and sync()
+    
+    def append(self, line: bytes, sync: bool = False):
+        """Queue a serialized record, starting the writer thread if it isn't running"""
+        with self._cv:
+            self._pending.append(line)
+            self._sync_requested |= sync
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="user-nodes-writer", daemon=True)
+                self._thread.start()
+            self._cv.notify()
+    
+    def request_sync(self):
+        """Ask the writer to fsync once everything queued so far is written"""
+        with self._cv:
+            if self._thread is not None:
+                self._sync_requested = True
+                self._cv.notify()
+    
+    def _run(self):
+        """Writer thread - writes queued records in one go per wake-up"""
+        cv = self._cv
+        while True:
+            with cv:
+                cv.wait_for(lambda: self._pending or self._sync_requested or self._stopping)
+                if not self._pending and not self._sync_requested:
+                    return  # Stopping and drained
+                todo, self._pending = self._pending, []
+                sync, self._sync_requested = self._sync_requested, False
+                self._writing = True
+            try:
+                with self._io_lock:
+                    if self._log is None:
+                        self._log = open(self.log_path, "ab", buffering=1 << 20)
+                    self._log.write(b"".join(todo))
+                    self._log.flush()
+                    if sync:
+                        os.fsync(self._log.fileno())
+            except Exception as e:
+                # Surfaced to the caller by the next flush()
+                self._error = e
+            finally:
+                with cv:
+                    self._writing = False
+                    cv.notify_all()
+    
+    def flush(self):
+        """Block until every queued record is written"""
+        with self._cv:
+            self._cv.wait_for(lambda: not self._pending and not self._writing)
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+    
+    def sync(self):
+        """fsync the log, if it is open"""
+        with self._io_lock:
+            if self._log is not None:
+                os.fsync(self._log.fileno())
+    
+    def close(self):
+        """Write everything queued, stop the writer thread and close the log - safe to call twice"""
+        self.flush()
+        with self._cv:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._cv.notify_all()
+        if thread is not None:
+            thread.join()
+        
+        with self._io_lock:
+            if self._log is None:
+                return
+            os.fsync(self._log.fileno())
+            self._log.close()
+            self._log = None
+
+
 class UserNodes:
     """
     Main class managing the linked list structure of nodes
@@ -96,7 +223,30 @@ class UserNodes:
     def __init__(self, storage_path: str = None):
         self.storage_path = storage_path or os.path.join(os.path.dirname(__file__), "node_data")
         self.nodes: Dict[str, Node] = {}  # In-memory cache of nodes
+        self._deleted: set = set()  # IDs deleted since the last compaction
+        self._stale: set = set()  # IDs whose snapshot file is out of date - rewritten at compaction
+        # child ID -> IDs of cached nodes pointing at it. Pointers added with add_next_node()
+        # are indexed by save_node(); ones dropped with remove_next_node() may linger
+        self._reverse: Dict[str, set] = {}
+        # node type -> IDs of cached nodes of that type (dict as an ordered set)
+        self._by_type: Dict[str, Dict[str, None]] = {
+            NodeType.CONDITION: {}, NodeType.LISTENER: {}, NodeType.EVENT: {}
+        }
+        self._fully_loaded = False  # Every snapshot file has been read into the cache
+        self._log_size = 0  # Bytes in the log, including records not yet written
+        self._writer = _LogWriter(self._get_log_path())
+        self._dirty: set = set()  # Nodes saved inside a batch, written when it ends
+        self._batch_depth = 0
+        # Bumped on every mutation; memoized query results are only valid for one version
+        self._version = 0
+        self._memo: Dict[tuple, Any] = {}
+        self._memo_version = 0
+        self._missing: set = set()  # IDs with no node on disk - saves repeat file probes
         self._ensure_storage_exists()
+        self._replay_log()
+        # Close the log when this store is garbage collected, or at exit if it is still alive.
+        # The finalizer only holds the writer, so it doesn't keep the store itself alive.
+        weakref.finalize(self, self._writer.close)
     
     def _ensure_storage_exists(self):
         """Create storage directory if it doesn't exist"""
@@ -106,26 +256,217 @@ class UserNodes:
         """Get the file path for a node's JSON file"""
         return os.path.join(self.storage_path, f"{node_id}.json")
     
+    def _get_log_path(self) -> str:
+        """Get the file path of the mutation log"""
+        return os.path.join(self.storage_path, LOG_FILENAME)
+    
+    # ==================== LOG OPERATIONS ====================
+    
+    def _append(self, record: Dict, sync: bool = False):
+        """Queue a record for the writer thread - made durable by commit()"""
+        line = dumps_json(record) + b"\n"
+        self._log_size += len(line)
+        if record["op"] == "upsert":
+            self._stale.add(record["node"]["node_id"])
+        self._writer.append(line, sync)
+    
+    def _request_sync(self):
+        """Ask the writer to fsync once everything queued so far is written"""
+        self._writer.request_sync()
+    
+    def flush(self):
+        """Block until the writer thread has written every queued record"""
+        self._writer.flush()
+    
+    def _replay_log(self):
+        """Apply every record in the log on top of the snapshot files"""
+        try:
+            f = open(self._get_log_path(), "rb")
+        except FileNotFoundError:
+            self._log_size = 0
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            good = 0  # Offset just past the last complete record
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("record has no line terminator")
+                    record = loads_json(line)
+                except ValueError:
+                    # A torn final line from an interrupted write - nothing after it was committed
+                    logger.warning("⚠️  Dropping unreadable record at byte %d of %s", good, LOG_FILENAME)
+                    break
+                good += len(line)
+                if record["op"] == "upsert":
+                    node = Node.from_dict_fast(record["node"])
+                    self._cache_node(node)
+                    self._deleted.discard(node.node_id)
+                    self._stale.add(node.node_id)
+                else:
+                    self._forget(record["id"])
+        if good < size:
+            # Cut the torn tail off so new records are appended after the last good one
+            with open(self._get_log_path(), "r+b") as f:
+                f.truncate(good)
+        self._log_size = good
+    
+    def _forget(self, node_id: str):
+        """Drop a deleted node from the cache and from cached nodes pointing at it"""
+        node = self.nodes.pop(node_id, None)
+        if node is not None:
+            self._unindex(node)
+            self._by_type[node.node_type].pop(node_id, None)
+        self._deleted.add(node_id)
+        self._stale.discard(node_id)
+        for parent_id in self._reverse.pop(node_id, ()):
+            parent = self.nodes.get(parent_id)
+            if parent is not None and node_id in parent.next_nodes:
+                parent.remove_next_node(node_id)
+                self._stale.add(parent_id)  # Its snapshot may still point at the deleted node
+    
+    # ==================== MEMO OPERATIONS ====================
+    
+    def _mutated(self):
+        """Invalidate memoized results and the negative cache after a change"""
+        self._version += 1
+        if self._missing:
+            self._missing.clear()
+    
+    def _memo_get(self, key: tuple) -> Any:
+        """Look up a memoized query result, dropping every entry if a mutation happened since"""
+        if self._memo_version != self._version:
+            self._memo.clear()
+            self._memo_version = self._version
+        return self._memo.get(key)
+    
+    # ==================== INDEX OPERATIONS ====================
+    
+    def _cache_node(self, node: Node):
+        """Put a node in the cache and index its outgoing pointers"""
+        old = self.nodes.get(node.node_id)
+        if old is not None:
+            self._unindex(old)
+            if old.node_type != node.node_type:
+                self._by_type[old.node_type].pop(node.node_id, None)
+        self.nodes[node.node_id] = node
+        self._by_type.setdefault(node.node_type, {})[node.node_id] = None
+        self._index(node)
+    
+    def _index(self, node: Node):
+        """Add a node's outgoing pointers to the reverse index (already indexed ones are kept)"""
+        for child_id in node.next_nodes:
+            self._reverse.setdefault(child_id, set()).add(node.node_id)
+    
+    def _unindex(self, node: Node):
+        """Remove a node's outgoing pointers from the reverse index"""
+        for child_id in node.next_nodes:
+            parents = self._reverse.get(child_id)
+            if parents is not None:
+                parents.discard(node.node_id)
+                if not parents:
+                    del self._reverse[child_id]
+    
+    def _link(self, parent: Node, child_id: str):
+        """Point parent at child_id, keeping the reverse index in step"""
+        parent.add_next_node(child_id)
+        self._reverse.setdefault(child_id, set()).add(parent.node_id)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group mutations into a single commit.
+        
+        Nodes saved inside the block are written once each when the outermost
+        batch exits, followed by one fsync on the writer thread. Batches can be nested.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                dirty, self._dirty = self._dirty, set()
+                for node_id in dirty:
+                    # Nodes deleted later in the batch already have their del record
+                    node = self.nodes.get(node_id)
+                    if node is not None:
+                        # Pick up pointers added with add_next_node() since save_node()
+                        self._index(node)
+                        self._append({"op": "upsert", "node": node.to_dict()})
+                if self._log_size > COMPACT_THRESHOLD:
+                    self.commit()
+                else:
+                    self._request_sync()
+    
+    def commit(self):
+        """Wait for the writer, then fsync the log once - everything saved so far is durable"""
+        self._writer.flush()
+        self._writer.sync()
+        if self._log_size > COMPACT_THRESHOLD:
+            self.compact()
+    
+    def compact(self):
+        """Rewrite the snapshot files that are out of date and truncate the log"""
+        # Make the log durable first - until it is removed below, a crash at any
+        # point replays it on top of whichever snapshots made it to disk
+        self.close()
+        if self._deleted:
+            # Snapshots not cached yet may still point at deleted nodes - loading
+            # them drops those pointers and marks them for rewriting
+            self.get_all_nodes()
+        for node_id in self._stale:
+            self._write_node_file(self.nodes[node_id])
+        for node_id in self._deleted:
+            try:
+                os.remove(self._get_node_file_path(node_id))
+            except FileNotFoundError:
+                pass
+        self._sync_storage_dir()
+        self._stale.clear()
+        self._deleted.clear()
+        
+        # Snapshot is on disk - start a fresh log
+        try:
+            os.remove(self._get_log_path())
+        except FileNotFoundError:
+            pass
+        self._log_size = 0
+    
+    def _sync_storage_dir(self):
+        """fsync the storage directory so renames and removals in it are durable"""
+        if os.name == "nt":
+            return  # Directories can't be opened for fsync on Windows
+        fd = os.open(self.storage_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def close(self):
+        """Commit, stop the writer thread and close the log"""
+        self._writer.close()
+    
     # ==================== CREATE OPERATIONS ====================
     
     def create_condition(self, data: Dict = None) -> ConditionNode:
         """Create a new condition node"""
         node = ConditionNode(data=data)
-        self.nodes[node.node_id] = node
+        self._cache_node(node)
         self.save_node(node.node_id)
         return node
     
     def create_listener(self, data: Dict = None) -> ListenerNode:
         """Create a new listener node"""
         node = ListenerNode(data=data)
-        self.nodes[node.node_id] = node
+        self._cache_node(node)
         self.save_node(node.node_id)
         return node
     
     def create_event(self, data: Dict = None) -> EventNode:
         """Create a new event node"""
         node = EventNode(data=data)
-        self.nodes[node.node_id] = node
+        self._cache_node(node)
         self.save_node(node.node_id)
         return node
     
@@ -147,8 +488,9 @@ class UserNodes:
         
         # Note: Multiple conditions CAN link to the same listener (this is allowed)
         
-        condition.add_listener(listener_id)
-        self.save_node(condition_id)
+        with self.batch():
+            self._link(condition, listener_id)
+            self.save_node(condition_id)
     
     def link_listener_to_event(self, listener_id: str, event_id: str):
         """Link a listener to an event - listeners CAN share events"""
@@ -160,84 +502,118 @@ class UserNodes:
         if event.node_type != NodeType.EVENT:
             raise ValueError(f"Node {event_id} is not an event")
         
-        listener.add_event(event_id)
-        self.save_node(listener_id)
+        with self.batch():
+            self._link(listener, event_id)
+            self.save_node(listener_id)
     
     # ==================== READ OPERATIONS ====================
     
     def get_node(self, node_id: str) -> Optional[Node]:
         """Get a node by ID (from cache or load from disk)"""
-        if node_id in self.nodes:
-            return self.nodes[node_id]
+        node = self.nodes.get(node_id)
+        if node is not None:
+            return node
+        
+        if node_id in self._deleted or node_id in self._missing:
+            return None
         
         # Try to load from disk
         node_data = self._load_node_from_file(node_id)
         if node_data:
-            node = Node.from_dict(node_data)
-            self.nodes[node_id] = node
-            return node
+            return self._cache_snapshot(node_data)
         
+        if len(self._missing) >= MISSING_CACHE_SIZE:
+            self._missing.clear()
+        self._missing.add(node_id)
         return None
     
+    def _cache_snapshot(self, node_data: Dict) -> Node:
+        """Cache a node read from its snapshot file"""
+        node = Node.from_dict_fast(node_data)
+        if self._deleted:
+            # The snapshot predates these deletions - drop pointers to them
+            next_nodes = {n: None for n in node.next_nodes if n not in self._deleted}
+            if len(next_nodes) != len(node.next_nodes):
+                node.next_nodes = next_nodes
+                self._stale.add(node.node_id)
+        self._cache_node(node)
+        return node
+    
     def _load_node_from_file(self, node_id: str) -> Optional[Dict]:
         """Load node data from JSON file"""
-        file_path = self._get_node_file_path(node_id)
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        return None
+        try:
+            return read_json(self._get_node_file_path(node_id))
+        except FileNotFoundError:
+            return None
     
     def get_all_nodes(self) -> Dict[str, Node]:
         """Get all nodes (loads all from disk if needed)"""
-        # Load all nodes from storage
-        for filename in os.listdir(self.storage_path):
-            if filename.endswith('.json'):
-                node_id = filename[:-5]
-                if node_id not in self.nodes:
-                    self.get_node(node_id)
+        if self._fully_loaded:
+            return self.nodes
+        
+        # Load all nodes from storage - scandir entries carry the name and type,
+        # so there is no separate stat or exists() check per file
+        with os.scandir(self.storage_path) as it:
+            paths = [
+                entry.path for entry in it
+                if entry.name.endswith('.json') and entry.is_file()
+                and entry.name[:-5] not in self.nodes and entry.name[:-5] not in self._deleted
+            ]
+        if len(paths) > PARALLEL_LOAD_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+                loaded = list(executor.map(read_json, paths))
+        else:
+            loaded = map(read_json, paths)
+        
+        # Caching stays on this thread - the indexes are not thread-safe
+        for node_data in loaded:
+            if node_data:
+                self._cache_snapshot(node_data)
+        self._fully_loaded = True
         return self.nodes
     
     def get_nodes_by_type(self, node_type: str) -> List[Node]:
         """Get all nodes of a specific type"""
         self.get_all_nodes()  # Ensure all nodes are loaded
-        return [node for node in self.nodes.values() if node.node_type == node_type]
+        nodes = self.nodes
+        return [nodes[node_id] for node_id in self._by_type.get(node_type, ())]
     
     # ==================== SAVE OPERATIONS ====================
     
     def save_node(self, node_id: str):
-        """Save a node to disk as JSON file"""
+        """Append the node's current state to the log (durable after commit())"""
         if node_id not in self.nodes:
             raise ValueError(f"Node {node_id} not found in cache")
         
+        self._mutated()
         node = self.nodes[node_id]
-        file_path = self._get_node_file_path(node_id)
-        
-        with open(file_path, 'w') as f:
-            json.dump(node.to_dict(), f, indent=2)
+        # Pointers may have been added directly with add_next_node()
+        self._index(node)
+        if self._batch_depth:
+            self._dirty.add(node_id)
+        else:
+            self._append({"op": "upsert", "node": node.to_dict()})
+    
+    def _write_node_file(self, node: Node):
+        """Write a node's snapshot JSON file"""
+        write_json_atomic(self._get_node_file_path(node.node_id), node.to_dict())
     
     def save_all_nodes(self):
         """Save all cached nodes to disk"""
-        for node_id in self.nodes:
-            self.save_node(node_id)
+        with self.batch():
+            for node_id in self.nodes:
+                self.save_node(node_id)
     
     # ==================== DELETE OPERATIONS ====================
     
     def delete_node(self, node_id: str):
         """Delete a node and remove it from other nodes' references"""
-        # Remove from other nodes' next_nodes lists
-        for node in self.nodes.values():
-            if node_id in node.next_nodes:
-                node.remove_next_node(node_id)
-                self.save_node(node.node_id)
-        
-        # Remove from cache
-        if node_id in self.nodes:
-            del self.nodes[node_id]
-        
-        # Remove file from disk
-        file_path = self._get_node_file_path(node_id)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        # A single record - replaying it also unlinks the node from its parents,
+        # so they don't need to be rewritten. The snapshot file goes at compaction.
+        self._mutated()
+        with self.batch():
+            self._append({"op": "del", "id": node_id})
+            self._forget(node_id)
     
     # ==================== TRAVERSAL OPERATIONS ====================
     
@@ -246,18 +622,20 @@ class UserNodes:
         chain = []
         visited = set()
         
-        def traverse(node_id: str):
+        # Iterative depth-first walk - children are pushed in reverse so they pop in
+        # order, giving the same pre-order as recursion without the frame cost or depth limit
+        stack = [start_node_id]
+        while stack:
+            node_id = stack.pop()
             if node_id in visited:
-                return
+                continue
             visited.add(node_id)
             
             node = self.get_node(node_id)
             if node:
                 chain.append(node)
-                for next_node_id in node.next_nodes:
-                    traverse(next_node_id)
+                stack.extend(reversed(node.next_nodes))
         
-        traverse(start_node_id)
         return chain
     
     def get_listeners_for_condition(self, condition_id: str) -> List[ListenerNode]:
@@ -287,7 +665,15 @@ class UserNodes:
         return events
     
     def get_full_chain(self, condition_id: str) -> Dict[str, Any]:
-        """Get the complete chain from condition -> listeners -> events"""
+        """Get the complete chain from condition -> listeners -> events (treat the result as read-only)"""
+        key = ("full_chain", condition_id)
+        chain = self._memo_get(key)
+        if chain is None:
+            chain = self._memo[key] = self._build_full_chain(condition_id)
+        return chain
+    
+    def _build_full_chain(self, condition_id: str) -> Dict[str, Any]:
+        """Walk condition -> listeners -> events for get_full_chain"""
         condition = self.get_node(condition_id)
         if not condition or condition.node_type != NodeType.CONDITION:
             return {}
@@ -317,52 +703,85 @@ class UserNodes:
     # ==================== UTILITY OPERATIONS ====================
     
     def clear_cache(self):
-        """Clear the in-memory cache"""
+        """Clear the in-memory cache, keeping only what is on disk"""
+        self.close()
+        self._mutated()
         self.nodes.clear()
-    
-    def export_all(self, output_file: str):
-        """Export all nodes organized by listeners (same format as HTML visual editor)"""
-        self.get_all_nodes()
+        self._reverse.clear()
+        for ids in self._by_type.values():
+            ids.clear()
+        self._fully_loaded = False
+        self._deleted.clear()
+        self._stale.clear()
+        self._replay_log()
+    
+    def _compile_export(self) -> tuple:
+        """
+        Lay out listener -> conditions/events once per mutation version
         
-        export_data = {
-            "listeners": [],
-            "total_listeners": 0
-        }
+        Returns (listener_nodes, conditions, events) where conditions[i] and events[i]
+        hold the export entries for listener_nodes[i]. Repeated exports between
+        mutations reuse this instead of walking the graph again.
+        """
+        key = ("compiled_export",)
+        compiled = self._memo_get(key)
+        if compiled is not None:
+            return compiled
         
-        # Get all listener nodes
-        listener_nodes = [node for node in self.nodes.values() if node.node_type == NodeType.LISTENER]
+        listener_nodes = self.get_nodes_by_type(NodeType.LISTENER)
+        slots = {listener_node.node_id: slot for slot, listener_node in enumerate(listener_nodes)}
+        conditions: List[List[Dict]] = [[] for _ in listener_nodes]
+        events: List[List[Dict]] = [[] for _ in listener_nodes]
         
-        for listener_node in listener_nodes:
-            listener_data = {
-                "listener_id": listener_node.node_id,
-                "listener_data": listener_node.data,
-                "conditions": [],
-                "events": []
-            }
-            
-            # Find all conditions connected to this listener
-            for cond_id, cond_node in self.nodes.items():
-                if cond_node.node_type == NodeType.CONDITION and listener_node.node_id in cond_node.next_nodes:
-                    listener_data["conditions"].append({
+        # Group conditions by the listener they point to in a single pass
+        for cond_node in self.get_nodes_by_type(NodeType.CONDITION):
+            for listener_id in cond_node.next_nodes:
+                slot = slots.get(listener_id)
+                if slot is not None:
+                    conditions[slot].append({
                         "condition_id": cond_node.node_id,
                         "condition_data": cond_node.data
                     })
-            
-            # Find all events connected to this listener
+        
+        # Find all events connected to each listener
+        nodes = self.nodes
+        for slot, listener_node in enumerate(listener_nodes):
             for event_id in listener_node.next_nodes:
-                event_node = self.nodes.get(event_id)
+                event_node = nodes.get(event_id)
                 if event_node and event_node.node_type == NodeType.EVENT:
-                    listener_data["events"].append({
+                    events[slot].append({
                         "event_id": event_node.node_id,
                         "event_data": event_node.data
                     })
-            
-            export_data["listeners"].append(listener_data)
         
-        export_data["total_listeners"] = len(export_data["listeners"])
+        compiled = self._memo[key] = (listener_nodes, conditions, events)
+        return compiled
+    
+    def export_all(self, output_file: str = None) -> Dict[str, Any]:
+        """
+        Export all nodes organized by listeners (same format as HTML visual editor)
         
-        with open(output_file, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        Returns the export dict, also writing it to output_file when one is given
+        """
+        listener_nodes, conditions, events = self._compile_export()
+        
+        # Fresh listener dicts and lists so callers can't disturb the compiled layout
+        export_data = {
+            "listeners": [
+                {
+                    "listener_id": listener_node.node_id,
+                    "listener_data": listener_node.data,
+                    "conditions": list(conditions[slot]),
+                    "events": list(events[slot])
+                }
+                for slot, listener_node in enumerate(listener_nodes)
+            ],
+            "total_listeners": len(listener_nodes)
+        }
+        
+        if output_file:
+            write_json(output_file, export_data)
+        return export_data
     
     def export_all_flat(self, output_file: str):
         """Export all nodes in flat structure (legacy format)"""
@@ -370,18 +789,18 @@ class UserNodes:
         export_data = {
             "nodes": [node.to_dict() for node in self.nodes.values()]
         }
-        with open(output_file, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        write_json(output_file, export_data)
     
     def import_from_file(self, input_file: str):
         """Import nodes from a JSON file"""
-        with open(input_file, 'r') as f:
-            data = json.load(f)
+        data = read_json(input_file)
         
-        for node_data in data.get('nodes', []):
-            node = Node.from_dict(node_data)
-            self.nodes[node.node_id] = node
-            self.save_node(node.node_id)
+        with self.batch():
+            for node_data in data.get('nodes', []):
+                node = Node.from_dict(node_data)
+                self._cache_node(node)
+                self._deleted.discard(node.node_id)
+                self.save_node(node.node_id)
 
 
 # ==================== EXAMPLE USAGE ====================
@@ -399,46 +818,47 @@ def example_usage():
     user_nodes._ensure_storage_exists()
     user_nodes.clear_cache()
     
-    # Example 1: Security camera motion detection
-    print("Creating security camera motion detection setup...")
-    condition1 = user_nodes.create_condition(data={"name": "nighttime", "threshold": 0.7, "type": "time"})
-    condition2 = user_nodes.create_condition(data={"name": "motion_detected", "threshold": 0.85, "type": "motion"})
-    listener1 = user_nodes.create_listener(data={"name": "security_camera_alert", "type": "video_stream"})
-    event1 = user_nodes.create_event(data={"action": "send_notification", "recipient": "security@company.com"})
-    event2 = user_nodes.create_event(data={"action": "record_video", "duration": "30s"})
-    
-    user_nodes.link_condition_to_listener(condition1.node_id, listener1.node_id)
-    user_nodes.link_condition_to_listener(condition2.node_id, listener1.node_id)
-    user_nodes.link_listener_to_event(listener1.node_id, event1.node_id)
-    user_nodes.link_listener_to_event(listener1.node_id, event2.node_id)
-    
-    # Example 2: Package delivery detection
-    print("Creating package delivery detection setup...")
-    condition3 = user_nodes.create_condition(data={"name": "object_at_door", "threshold": 0.9, "type": "object_detection"})
-    listener2 = user_nodes.create_listener(data={"name": "package_detector", "type": "doorbell_camera"})
-    event3 = user_nodes.create_event(data={"action": "send_sms", "message": "Package delivered!"})
-    
-    user_nodes.link_condition_to_listener(condition3.node_id, listener2.node_id)
-    user_nodes.link_listener_to_event(listener2.node_id, event3.node_id)
-    
-    # Example 3: Temperature monitoring
-    print("Creating temperature monitoring setup...")
-    condition4 = user_nodes.create_condition(data={"name": "high_temperature", "threshold": 75.0, "type": "sensor"})
-    listener3 = user_nodes.create_listener(data={"name": "temp_monitor", "type": "iot_sensor"})
-    event4 = user_nodes.create_event(data={"action": "trigger_alert", "priority": "high"})
-    event5 = user_nodes.create_event(data={"action": "activate_cooling", "duration": "15m"})
-    
-    user_nodes.link_condition_to_listener(condition4.node_id, listener3.node_id)
-    user_nodes.link_listener_to_event(listener3.node_id, event4.node_id)
-    user_nodes.link_listener_to_event(listener3.node_id, event5.node_id)
+    # Build all three setups in one batch - a single log write and fsync
+    # instead of one per create/link call
+    with user_nodes.batch():
+        # Example 1: Security camera motion detection
+        print("Creating security camera motion detection setup...")
+        condition1 = user_nodes.create_condition(data={"name": "nighttime", "threshold": 0.7, "type": "time"})
+        condition2 = user_nodes.create_condition(data={"name": "motion_detected", "threshold": 0.85, "type": "motion"})
+        listener1 = user_nodes.create_listener(data={"name": "security_camera_alert", "type": "video_stream"})
+        event1 = user_nodes.create_event(data={"action": "send_notification", "recipient": "security@company.com"})
+        event2 = user_nodes.create_event(data={"action": "record_video", "duration": "30s"})
+    
+        user_nodes.link_condition_to_listener(condition1.node_id, listener1.node_id)
+        user_nodes.link_condition_to_listener(condition2.node_id, listener1.node_id)
+        user_nodes.link_listener_to_event(listener1.node_id, event1.node_id)
+        user_nodes.link_listener_to_event(listener1.node_id, event2.node_id)
+    
+        # Example 2: Package delivery detection
+        print("Creating package delivery detection setup...")
+        condition3 = user_nodes.create_condition(data={"name": "object_at_door", "threshold": 0.9, "type": "object_detection"})
+        listener2 = user_nodes.create_listener(data={"name": "package_detector", "type": "doorbell_camera"})
+        event3 = user_nodes.create_event(data={"action": "send_sms", "message": "Package delivered!"})
+    
+        user_nodes.link_condition_to_listener(condition3.node_id, listener2.node_id)
+        user_nodes.link_listener_to_event(listener2.node_id, event3.node_id)
+    
+        # Example 3: Temperature monitoring
+        print("Creating temperature monitoring setup...")
+        condition4 = user_nodes.create_condition(data={"name": "high_temperature", "threshold": 75.0, "type": "sensor"})
+        listener3 = user_nodes.create_listener(data={"name": "temp_monitor", "type": "iot_sensor"})
+        event4 = user_nodes.create_event(data={"action": "trigger_alert", "priority": "high"})
+        event5 = user_nodes.create_event(data={"action": "activate_cooling", "duration": "15m"})
+    
+        user_nodes.link_condition_to_listener(condition4.node_id, listener3.node_id)
+        user_nodes.link_listener_to_event(listener3.node_id, event4.node_id)
+        user_nodes.link_listener_to_event(listener3.node_id, event5.node_id)
     
     # Export all nodes
     print("\nExporting node configuration...")
-    user_nodes.export_all("all_nodes_export.json")
+    export_data = user_nodes.export_all("all_nodes_export.json")
     
     # Print the export data
-    with open("all_nodes_export.json", 'r') as f:
-        export_data = json.load(f)
     print("\n" + "="*60)
     print("📋 EXPORTED LISTENER STRUCTURE:")
     print("="*60)
@@ -450,15 +870,14 @@ def example_usage():
     print("="*60)
     
     try:
-        from node_processing import process_listeners
+        from .node_processing import process_listeners
         processed_data = process_listeners(export_data)
         
         print("\n✅ Generated Prompts:")
         print(json.dumps(processed_data, indent=2))
         
         # Save processed output
-        with open("processed_nodes_output.json", 'w') as f:
-            json.dump(processed_data, f, indent=2)
+        write_json("processed_nodes_output.json", processed_data)
         print("\n💾 Processed output saved to: processed_nodes_output.json")
         
     except Exception as e:
@@ -3,13 +3,19 @@ Email Alert Automation Script
 Sends email alerts with configurable recipient, subject, and message.
 Simple script that just sends emails - no history tracking.
 """
+import atexit
+import logging
 import os
+import queue
 import smtplib
+import threading
+from concurrent.futures import Future, wait
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from pathlib import Path
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from backend/.env
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
@@ -20,8 +26,128 @@ SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
 SENDER_EMAIL = os.getenv('SENDER_EMAIL', '')
 SENDER_PASSWORD = os.getenv('SENDER_PASSWORD', '')
 
+# One logged-in SMTP connection shared across sends - STARTTLS + LOGIN is paid once
+# per burst instead of once per email. The lock serializes use of the connection.
+_smtp_conn = None
+_smtp_lock = threading.Lock()
+
+
+def _get_conn():
+    """Return the shared SMTP connection, (re)connecting if it is missing or dead"""
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            if _smtp_conn.noop()[0] == 250:
+                return _smtp_conn
+        except (smtplib.SMTPServerDisconnected, OSError):
+            pass
+        _reset_conn()
+    
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+    try:
+        server.starttls()  # Enable encryption
+        server.login(SENDER_EMAIL, SENDER_PASSWORD)
+    except BaseException:
+        server.close()
+        raise
+    _smtp_conn = server
+    return server
+
+
+def _reset_conn():
+    """Drop the shared connection without waiting on the server"""
+    global _smtp_conn
+    if _smtp_conn is not None:
+        _smtp_conn.close()
+        _smtp_conn = None
+
+
+def _send_or_reset(msg):
+    """Send over the shared connection, dropping it if the send fails so the next send reconnects"""
+    try:
+        _get_conn().send_message(msg)
+    except BaseException:
+        _reset_conn()
+        raise
+
+
+def close_connection():
+    """Politely close the shared SMTP connection (called by drain() at exit)"""
+    global _smtp_conn
+    with _smtp_lock:
+        if _smtp_conn is not None:
+            try:
+                _smtp_conn.quit()
+            except (smtplib.SMTPException, OSError):
+                _smtp_conn.close()
+            _smtp_conn = None
+
+
+# Background sender - queued emails go out over the shared connection one after
+# another, so callers don't block on the SMTP round-trip
+_queue: "queue.Queue" = queue.Queue()
+_worker_thread = None
+_worker_lock = threading.Lock()
+_pending = set()  # Futures of queued emails that have not been sent yet
+WORKER_BATCH_SIZE = 32  # Most emails taken off the queue per wake-up
+DRAIN_TIMEOUT = 30  # Seconds to wait at exit for queued emails to go out
+
+
+def drain(timeout=DRAIN_TIMEOUT):
+    """Wait for every queued email to be sent, then close the shared connection
+    (called automatically at exit, so the daemon sender doesn't drop queued emails)"""
+    not_done = wait(list(_pending), timeout=timeout).not_done
+    if not_done:
+        logger.warning("⚠️  %d queued email(s) not sent before exit", len(not_done))
+    close_connection()
+
 
-def send_email(recipient_email, subject, message):
+atexit.register(drain)
+
+
+def _worker():
+    """Drain the queue, sending each email and resolving its future"""
+    while True:
+        batch = [_queue.get()]
+        try:
+            while len(batch) < WORKER_BATCH_SIZE:
+                batch.append(_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        for future, args in batch:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(send_email(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+
+
+def _ensure_worker():
+    """Start the background sender on first use"""
+    global _worker_thread
+    with _worker_lock:
+        if _worker_thread is None:
+            _worker_thread = threading.Thread(target=_worker, name="email-alert-sender", daemon=True)
+            _worker_thread.start()
+
+
+def send_email_async(recipient_email, subject, message):
+    """
+    Queue an email alert and return immediately
+    
+    Returns:
+        concurrent.futures.Future: Resolves to the same result dict as send_email()
+    """
+    _ensure_worker()
+    future = Future()
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+    _queue.put((future, (recipient_email, subject, message)))
+    return future
+
+
+def send_email(recipient_email, subject, message, sync=True):
     """
     Send an email alert
     
@@ -29,10 +155,15 @@ def send_email(recipient_email, subject, message):
         recipient_email (str): Email address of the recipient
         subject (str): Email subject line
         message (str): Email message body
+        sync (bool): Block until sent. If False, queue the email and return a Future instead
     
     Returns:
         dict: Result with success status and message
+              (a concurrent.futures.Future resolving to it when sync=False)
     """
+    if not sync:
+        return send_email_async(recipient_email, subject, message)
+    
     # Validate configuration
     if not SENDER_EMAIL or not SENDER_PASSWORD:
         return {
@@ -46,25 +177,22 @@ def send_email(recipient_email, subject, message):
             "error": "Recipient email is required"
         }
     
-    # Create email
-    msg = MIMEMultipart()
+    # Create email - the body is the only part, so a single text/plain message
+    # replaces the multipart wrapper
+    msg = MIMEText(message, 'plain')
     msg['From'] = SENDER_EMAIL
     msg['To'] = recipient_email
     msg['Subject'] = subject
     
-    # Add message body
-    msg.attach(MIMEText(message, 'plain'))
-    
     try:
-        # Connect to SMTP server
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()  # Enable encryption
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        
-        # Send email
-        text = msg.as_string()
-        server.sendmail(SENDER_EMAIL, recipient_email, text)
-        server.quit()
+        # Send email over the shared connection - send_message serializes the
+        # message and takes the envelope addresses from its headers
+        with _smtp_lock:
+            try:
+                _send_or_reset(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Server dropped the idle connection between the liveness check and the send
+                _send_or_reset(msg)
         
         print(f"✅ Email sent successfully to {recipient_email}")
         return {
@@ -3,38 +3,47 @@ Avesia Backend API - Unified FastAPI Application
 Combines Overshoot SDK/Node system and MongoDB/Projects API
 """
 from fastapi import FastAPI, HTTPException, Header, File, UploadFile, Form, Query, Response, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
+from starlette.middleware.cors import ALL_METHODS as CORS_ALL_METHODS
+from fastapi.responses import FileResponse, JSONResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 from typing import List, Optional, Literal, Dict, Any
 from enum import Enum
+from collections import deque
+from contextlib import asynccontextmanager
+from itertools import islice
 from datetime import datetime
 import httpx
 import json
+import logging
 import os
+import queue
+import random
+import sys
 import asyncio
 import shutil
+import time
+import traceback
 import uuid
 from pathlib import Path
 from io import BytesIO
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from pymongo.errors import ConnectionFailure, PyMongoError
 from bson import ObjectId
 from bson.errors import InvalidId
 import cv2
+import uvicorn
 from PIL import Image
-import sys
 
-# Add Nodes directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent / "Nodes"))
-from node_processing import process_listeners
+from Nodes._json import orjson, loads_json, dumps_json
+from Nodes.node_processing import process_listeners
+from alerts.email_alert import send_email
 
 # Import prompt parser and converter
-sys.path.insert(0, str(Path(__file__).parent / "Nodes" / "nodes_assistant"))
 try:
-    from prompt_parser import parse_prompt
-    from converter import convert_to_export_format
+    from Nodes.nodes_assistant.prompt_parser import parse_prompt_async
+    from Nodes.nodes_assistant.converter import convert_to_export_format
     GEMINI_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️  Warning: Could not import prompt_parser: {e}")
@@ -42,18 +51,169 @@ except ImportError as e:
 
 load_dotenv()
 
-app = FastAPI(title="Avesia Backend API", version="1.0.0")
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed (same compact UTF-8 output)"""
 
-# CORS middleware - combine configurations
-frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[frontend_url, "*"],  # Allow frontend and all origins for development
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Characters a JSON document can start with (after leading JSON whitespace)
+JSON_WHITESPACE = " \t\n\r"
+JSON_START_CHARS = frozenset('{["tfn-0123456789')
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize nodes when server starts; on shutdown cancel background tasks,
+    close the shared HTTP client and stop the log listener"""
+    app.state.bg_tasks = set()
+    start_log_listener()
+    get_http_client()
+    await initialize_nodes_on_startup()
+    
+    yield
+    
+    tasks = list(app.state.bg_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    
+    http_client = getattr(app.state, "http", None)
+    if http_client is not None:
+        app.state.http = None
+        await http_client.aclose()
+    stop_log_listener()
+
+
+app = FastAPI(
+    title="Avesia Backend API",
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
+
+class FastCORS:
+    """
+    Pure-ASGI CORS middleware for this API's policy: any origin, with credentials,
+    all methods and all headers (the frontend and all origins for development).
+
+    Responds exactly like Starlette's CORSMiddleware configured that way, but every
+    constant header is encoded once here instead of rebuilt per request, and
+    responses aren't wrapped in Request/Response objects.
+    """
+
+    _PREFLIGHT_HEADERS = [
+        (b"vary", b"Origin, Access-Control-Request-Method, Access-Control-Request-Headers, "
+                  b"Access-Control-Request-Private-Network"),
+        (b"access-control-allow-methods", ", ".join(CORS_ALL_METHODS).encode()),
+        (b"access-control-max-age", b"600"),
+        (b"access-control-allow-credentials", b"true"),
+    ]
+    _ALLOWED_METHODS = frozenset(method.encode() for method in CORS_ALL_METHODS)
+    _CREDENTIALS = (b"access-control-allow-credentials", b"true")
+    _STRIP_WITH_ORIGIN = frozenset({b"vary", b"access-control-allow-origin", b"access-control-allow-credentials"})
+    _STRIP_WITHOUT_ORIGIN = frozenset({b"vary"})
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = request_method = request_headers = private_network = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+            elif name == b"access-control-request-private-network":
+                private_network = value
+
+        if origin is not None and scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(send, origin, request_method, request_headers, private_network)
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                strip = self._STRIP_WITHOUT_ORIGIN if origin is None else self._STRIP_WITH_ORIGIN
+                vary = []
+                headers = []
+                for name, value in message.get("headers", ()):
+                    lowered = name.lower()
+                    if lowered == b"vary":
+                        vary.append(value)
+                    if lowered not in strip:
+                        headers.append((name, value))
+                vary.append(b"Origin")
+                headers.append((b"vary", b", ".join(vary)))
+                if origin is not None:
+                    headers.append((b"access-control-allow-origin", origin))
+                    headers.append(self._CREDENTIALS)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight(self, send, origin, request_method, request_headers, private_network):
+        """Answer a CORS preflight without calling the app"""
+        headers = list(self._PREFLIGHT_HEADERS)
+        headers.append((b"access-control-allow-origin", origin))
+        if request_headers is not None:
+            headers.append((b"access-control-allow-headers", request_headers))
+
+        failures = []
+        if request_method not in self._ALLOWED_METHODS:
+            failures.append("method")
+        if private_network is not None:
+            failures.append("private-network")
+
+        if failures:
+            status, body = 400, ("Disallowed CORS " + ", ".join(failures)).encode()
+        else:
+            status, body = 200, b"OK"
+        headers.append((b"content-length", str(len(body)).encode()))
+        headers.append((b"content-type", b"text/plain; charset=utf-8"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+class HealthFastPath:
+    """
+    Pure-ASGI short-circuit for liveness/readiness probes: GET /health without an
+    Origin header is answered here, before CORS or routing run. Browser requests
+    (which send Origin) take the normal route so they still get CORS headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["path"] == "/health"
+            and scope["method"] == "GET"
+            and not any(name == b"origin" for name, _ in scope["headers"])
+        ):
+            response = await health_check()
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+# CORS middleware - the frontend and all origins are allowed for development
+frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
+app.add_middleware(FastCORS)
+# Added last so it is the outermost middleware and probes skip everything else
+app.add_middleware(HealthFastPath)
+
 # ============================================================================
 # MongoDB Configuration
 # ============================================================================
@@ -84,6 +244,15 @@ try:
     client.admin.command('ping')
     db = client[DATABASE_NAME]
     print("✅ MongoDB connected successfully")
+    
+    # Indexes for the per-user project list and per-project clip list queries, so they
+    # walk an index in sort order instead of scanning and sorting in memory
+    # (creating an index that already exists is a no-op)
+    try:
+        db.projects.create_index([("userId", 1), ("createdAt", -1)])
+        db.video_clips.create_index([("projectId", 1), ("createdAt", -1)])
+    except PyMongoError as e:
+        print(f"⚠️  Could not create MongoDB indexes: {e}")
 except ConnectionFailure as e:
     print(f"⚠️  Failed to connect to MongoDB: {e}")
     print("\n🔍 Troubleshooting tips:")
@@ -113,9 +282,24 @@ except Exception as e:
 NODE_SERVICE_URL = os.getenv("NODE_SERVICE_URL", "http://localhost:3001")
 OVERSHOOT_API_KEY = os.getenv("OVERSHOOT_API_KEY", "")
 OVERSHOOT_API_URL = os.getenv("OVERSHOOT_API_URL", "https://cluster1.overshoot.ai/api/v0.2")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Health probe results are cached as (expires_at, value) for HEALTH_TTL_SECONDS, and
+# health responses tell clients/proxies they may reuse them for as long
+HEALTH_TTL_SECONDS = 1.0
+HEALTH_HEADERS = {"Cache-Control": "max-age=1"}
+node_status_cache = (0.0, "unknown")
+mongodb_ping_cache = (0.0, False)
 
-# Store results in memory (consider using a database for production)
-results_store: List[dict] = []
+# Result/alert logging - records are queued and written by a background thread (see start_log_listener)
+logger = logging.getLogger(__name__)
+log_listener: Optional[QueueListener] = None
+
+# Store the last 100 results in memory (consider using a database for production)
+# A bounded deque evicts the oldest result in O(1) on append. Each result is stored
+# already JSON-encoded, so reads just join bytes instead of re-serializing.
+RESULTS_STORE_SIZE = 100
+results_store: deque = deque(maxlen=RESULTS_STORE_SIZE)
 
 # Rate limiting for email alerts: track last email sent time per listener per project
 # Format: {project_id: {listener_id: timestamp}}
@@ -123,6 +307,9 @@ results_store: List[dict] = []
 email_rate_limit: Dict[str, Dict[str, float]] = {}
 EMAIL_RATE_LIMIT_SECONDS = 120  # 2 minutes
 
+# Lowercased event_type values that trigger an email alert (precomputed lookup table)
+EMAIL_EVENT_TYPES = frozenset({"gmail", "email"})
+
 # Rate limiting for clip saving: track last clip saved time per listener per project
 # Format: {project_id: {listener_id: timestamp}}
 # This prevents duplicate clips by limiting to once every 5 minutes per listener
@@ -156,6 +343,10 @@ class Node(BaseModel):
     name: Optional[str] = Field(None, description="Optional name/identifier for the node")
 
 
+# Validates a whole list of node dicts in a single call
+NODE_LIST_ADAPTER = TypeAdapter(List[Node])
+
+
 class Result(BaseModel):
     result: str
     timestamp: str
@@ -193,8 +384,7 @@ class Project(BaseModel):
     createdAt: datetime
     updatedAt: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # ============================================================================
 # Helper Functions
@@ -207,12 +397,97 @@ def get_user_id(x_user_id: Optional[str] = Header(None)) -> str:
     return x_user_id
 
 
-def convert_nodes_to_output_schema(nodes: List[Node]) -> Dict[str, Any]:
+def parse_object_id(project_id: str) -> ObjectId:
+    """Convert a project ID path parameter to an ObjectId, or fail with 400"""
+    try:
+        return ObjectId(project_id)
+    except (InvalidId, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid project ID")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Shared HTTP client for calls to the Node.js service.
+    Created on first use and closed at shutdown, so connections are pooled and
+    kept alive across requests instead of reconnecting on every call.
+    """
+    http_client = getattr(app.state, "http", None)
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            base_url=NODE_SERVICE_URL,
+            timeout=httpx.Timeout(10.0, connect=2.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30),
+        )
+        app.state.http = http_client
+    return http_client
+
+
+_timestamp_second = None
+_timestamp_prefix = ""
+
+
+def iso_timestamp_now() -> str:
+    """
+    Current local time in datetime.isoformat() format (YYYY-MM-DDTHH:MM:SS.ffffff).
+    The date/time prefix is only re-formatted when the second changes, so results
+    arriving within the same second just append their microseconds.
+    """
+    global _timestamp_second, _timestamp_prefix
+    now = time.time()
+    second = int(now)
+    if second != _timestamp_second:
+        _timestamp_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        _timestamp_second = second
+    return "%s.%06d" % (_timestamp_prefix, int((now - second) * 1_000_000))
+
+
+def start_log_listener():
+    """
+    Route this module's log records through a queue to a background QueueListener
+    that prints them to stdout, so request handlers never block on console I/O.
+    Debug records are skipped (not even formatted) unless LOG_LEVEL=DEBUG.
     """
-    Convert a list of nodes to Overshoot SDK outputSchema format.
+    global log_listener
+    if log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    log_listener = QueueListener(log_queue, stream_handler)
+    log_listener.start()
+
+
+def stop_log_listener():
+    """Write out any queued log records and stop the listener thread"""
+    global log_listener
+    if log_listener is None:
+        return
+    log_listener.stop()
+    log_listener = None
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(handler)
+    logger.propagate = True
+
+
+# JSON schema for each node datatype (unknown types map to string)
+SCHEMA_BY_DATATYPE: Dict[str, Dict[str, str]] = {
+    NodeDataType.BOOLEAN: {"type": "boolean"},
+    NodeDataType.INTEGER: {"type": "integer"},
+    NodeDataType.NUMBER: {"type": "number"},
+    NodeDataType.STRING: {"type": "string"},
+}
+DEFAULT_SCHEMA = SCHEMA_BY_DATATYPE[NodeDataType.STRING]
+
+
+def convert_nodes_to_output_schema(nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert a list of node dicts to Overshoot SDK outputSchema format.
     
     Example:
-        Input: [Node(prompt="Is there a person?", datatype="boolean", name="has_person")]
+        Input: [{"prompt": "Is there a person?", "datatype": "boolean", "name": "has_person"}]
         Output: {
             "type": "object",
             "properties": {
@@ -220,80 +495,136 @@ def convert_nodes_to_output_schema(nodes: List[Node]) -> Dict[str, Any]:
             }
         }
     """
-    properties = {}
-    
-    for i, node in enumerate(nodes):
-        # Use node.name if provided, otherwise generate a name from index
-        field_name = node.name or f"node_{i}"
-        
-        # Map Python datatype to JSON schema type
-        if node.datatype == NodeDataType.BOOLEAN:
-            properties[field_name] = {"type": "boolean"}
-        elif node.datatype == NodeDataType.INTEGER:
-            properties[field_name] = {"type": "integer"}
-        elif node.datatype == NodeDataType.NUMBER:
-            properties[field_name] = {"type": "number"}
-        elif node.datatype == NodeDataType.STRING:
-            properties[field_name] = {"type": "string"}
-        else:
-            # Default to string if unknown type
-            properties[field_name] = {"type": "string"}
-    
+    # Use the node name if provided, otherwise generate a name from index, and map
+    # the datatype to its JSON schema type (string if unknown). Each property gets
+    # its own copy so a caller editing the schema can't change SCHEMA_BY_DATATYPE.
     return {
         "type": "object",
-        "properties": properties
+        "properties": {
+            node.get("name") or f"node_{i}": SCHEMA_BY_DATATYPE.get(node["datatype"], DEFAULT_SCHEMA).copy()
+            for i, node in enumerate(nodes)
+        }
     }
 
 
-def create_combined_prompt(nodes: List[Node]) -> str:
+def create_combined_prompt(nodes: List[Dict[str, Any]]) -> str:
     """
-    Create a combined prompt from multiple nodes.
+    Create a combined prompt from multiple node dicts.
     
     Example:
         Input: [
-            Node(prompt="Is there a person?", datatype="boolean", name="has_person"),
-            Node(prompt="Count the cans", datatype="integer", name="can_count")
+            {"prompt": "Is there a person?", "datatype": "boolean", "name": "has_person"},
+            {"prompt": "Count the cans", "datatype": "integer", "name": "can_count"}
         ]
         Output: "1. Is there a person? 2. Count the cans"
     """
+    if not nodes:
+        return ""
     if len(nodes) == 1:
-        return nodes[0].prompt
-    
-    prompts = []
-    for i, node in enumerate(nodes, 1):
-        prompts.append(f"{i}. {node.prompt}")
+        return nodes[0]["prompt"]
     
-    return " ".join(prompts)
+    return " ".join(f"{i}. {node['prompt']}" for i, node in enumerate(nodes, 1))
+
+
+# outputSchema and combined prompt for the nodes currently in nodes_store,
+# rebuilt only when the stored node dicts change
+_nodes_config_cache: Dict[str, Any] = {"nodes": (), "outputSchema": {}, "prompt": DEFAULT_PROMPT, "body": None}
+
+
+def get_nodes_config() -> tuple:
+    """
+    Get (output_schema, combined_prompt) for nodes_store.
+    Built straight from the stored dicts (no Pydantic re-parse) and cached until
+    nodes_store holds different node dicts.
+    """
+    cache = _nodes_config_cache
+    cached_nodes = cache["nodes"]
+    if len(cached_nodes) != len(nodes_store) or any(a is not b for a, b in zip(cached_nodes, nodes_store)):
+        if nodes_store:
+            cache["outputSchema"] = convert_nodes_to_output_schema(nodes_store)
+            cache["prompt"] = create_combined_prompt(nodes_store)
+        else:
+            cache["outputSchema"] = {}
+            cache["prompt"] = DEFAULT_PROMPT
+        cache["nodes"] = tuple(nodes_store)
+        cache["body"] = None
+    return cache["outputSchema"], cache["prompt"]
+
+
+def get_nodes_body() -> bytes:
+    """Encoded GET /api/nodes response body, cached along with the schema and prompt"""
+    output_schema, combined_prompt = get_nodes_config()
+    cache = _nodes_config_cache
+    if cache["body"] is None:
+        cache["body"] = dumps_json({
+            "nodes": nodes_store,
+            "count": len(nodes_store),
+            "outputSchema": output_schema,
+            "prompt": combined_prompt
+        })
+    return cache["body"]
+
+
+# ((mtime_ns, size) of sample_nodes.json or None if missing, last load result)
+nodes_file_cache: tuple = (None, None)
 
 
-def load_nodes_from_file() -> tuple:
+async def load_nodes_from_file() -> tuple:
     """
     Load nodes from sample_nodes.json file.
-    Returns: (nodes_list, output_schema, combined_prompt)
+    The file is only re-read when its mtime or size changes (or it appears/disappears);
+    otherwise the last result is returned with fresh copies of the node dicts.
+    Reading and parsing run in a worker thread so the event loop isn't blocked.
+    Returns: (node_dicts, output_schema, combined_prompt)
     """
+    global nodes_file_cache
     nodes_file = "sample_nodes.json"
     
+    try:
+        st = os.stat(nodes_file)
+        file_key = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        file_key = None
+    
+    cached_key, cached_result = nodes_file_cache
+    if cached_result is None or cached_key != file_key:
+        cached_result = await asyncio.to_thread(read_nodes_file, nodes_file)
+        nodes_file_cache = (file_key, cached_result)
+    
+    nodes, output_schema, combined_prompt = cached_result
+    # Callers fill in ids/names in place, so they each get their own node dicts
+    return [dict(node) for node in nodes], output_schema, combined_prompt
+
+
+def read_nodes_file(nodes_file: str) -> tuple:
+    """
+    Parse and validate a nodes file.
+    Returns: (node_dicts, output_schema, combined_prompt)
+    """
     try:
         if not os.path.exists(nodes_file):
             print(f"⚠️  {nodes_file} not found. Using default prompt.")
             return [], {}, DEFAULT_PROMPT
         
-        with open(nodes_file, 'r') as f:
-            data = json.load(f)
+        with open(nodes_file, 'rb') as f:
+            data = loads_json(f.read())
         
         if not data.get("nodes") or not isinstance(data["nodes"], list):
             print(f"⚠️  Invalid {nodes_file} format. Using default prompt.")
             return [], {}, DEFAULT_PROMPT
         
-        # Parse nodes
-        nodes = []
-        for node_data in data["nodes"]:
-            try:
-                node = Node(**node_data)
-                nodes.append(node)
-            except Exception as e:
-                print(f"⚠️  Error parsing node: {e}")
-                continue
+        # Parse nodes - validated in one pass and kept as plain dicts. If any node
+        # is invalid, fall back to validating one by one to skip just the bad ones.
+        try:
+            nodes = [node.model_dump() for node in NODE_LIST_ADAPTER.validate_python(data["nodes"])]
+        except ValidationError:
+            nodes = []
+            for node_data in data["nodes"]:
+                try:
+                    nodes.append(Node.model_validate(node_data).model_dump())
+                except ValidationError as e:
+                    print(f"⚠️  Error parsing node: {e}")
+                    continue
         
         if not nodes:
             print(f"⚠️  No valid nodes in {nodes_file}. Using default prompt.")
@@ -311,60 +642,83 @@ def load_nodes_from_file() -> tuple:
         return [], {}, DEFAULT_PROMPT
 
 
-async def send_nodes_to_nodejs(nodes_with_ids, output_schema, combined_prompt, retry_count=0):
-    """Send nodes to Node.js service with retry logic"""
-    max_retries = 2  # Reduced from 5 to fail faster
-    retry_delay = 1  # Reduced from 2 to fail faster
+def with_node_ids(node_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Fill in missing node ids and names in place (id falls back to name, then
+    node_{index}; name falls back to id) and return the list for storing.
+    """
+    for i, node_dict in enumerate(node_dicts):
+        if not node_dict.get("id"):
+            node_dict["id"] = node_dict.get("name") or f"node_{i}"
+        node_dict["name"] = node_dict.get("name") or node_dict["id"]
+    return node_dicts
+
+
+def is_retryable_error(error: httpx.HTTPError) -> bool:
+    """Connection/timeout errors, 5xx and 429 may succeed on retry; other 4xx won't"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code >= 500 or status_code == 429
+    return isinstance(error, httpx.TransportError)
+
+
+async def send_nodes_to_nodejs(nodes_with_ids, output_schema, combined_prompt):
+    """
+    Send nodes to Node.js service with retry logic.
+    Retries use exponential backoff with full jitter so replicas restarting together
+    don't retry in lockstep; errors that can't succeed on retry fail immediately.
+    """
+    max_retries = 3
+    retry_base_delay = 0.5
+    max_retry_delay = 8.0
+    payload = {
+        "nodes": nodes_with_ids,
+        "outputSchema": output_schema,
+        "prompt": combined_prompt
+    }
     
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NODE_SERVICE_URL}/api/nodes",
-                json={
-                    "nodes": nodes_with_ids,
-                    "outputSchema": output_schema,
-                    "prompt": combined_prompt
-                },
+    http_client = get_http_client()
+    for attempt in range(max_retries):
+        try:
+            response = await http_client.post(
+                "/api/nodes",
+                json=payload,
                 timeout=2.0  # Reduced from 5.0 to fail faster
             )
             response.raise_for_status()
-            if nodes_with_ids:
-                print(f"✅ Nodes sent to Node.js service: {len(nodes_with_ids)} nodes")
-                print(f"   Prompt: {combined_prompt[:80]}...")
-            else:
-                print(f"⚠️  No nodes configured. Using default prompt: {combined_prompt}")
-            return True
-    except Exception as e:
-        if retry_count < max_retries:
-            print(f"⚠️  Could not send nodes to Node.js service (attempt {retry_count + 1}/{max_retries})...")
-            await asyncio.sleep(retry_delay)
-            return await send_nodes_to_nodejs(nodes_with_ids, output_schema, combined_prompt, retry_count + 1)
-        else:
-            print(f"⚠️  Could not send nodes to Node.js service after {max_retries} attempts")
-            print(f"   Node.js service may not be running. Nodes will be available via API.")
-            print(f"   Start Node.js service separately if needed.")
-            return False
+            break
+        except httpx.HTTPError as e:
+            if not is_retryable_error(e):
+                print(f"❌ Node.js service rejected nodes: {e}")
+                return False
+            if attempt == max_retries - 1:
+                print(f"⚠️  Could not send nodes to Node.js service after {max_retries} attempts")
+                print(f"   Node.js service may not be running. Nodes will be available via API.")
+                print(f"   Start Node.js service separately if needed.")
+                return False
+            print(f"⚠️  Could not send nodes to Node.js service (attempt {attempt + 1}/{max_retries})...")
+            await asyncio.sleep(min(max_retry_delay, retry_base_delay * 2 ** attempt) * random.random())
+    
+    if nodes_with_ids:
+        print(f"✅ Nodes sent to Node.js service: {len(nodes_with_ids)} nodes")
+        print(f"   Prompt: {combined_prompt[:80]}...")
+    else:
+        print(f"⚠️  No nodes configured. Using default prompt: {combined_prompt}")
+    return True
 
 
 async def initialize_nodes_on_startup():
     """Initialize nodes from file on startup and send to Node.js service"""
-    nodes, output_schema, combined_prompt = load_nodes_from_file()
+    nodes, output_schema, combined_prompt = await load_nodes_from_file()
     
     # Store nodes with IDs
-    nodes_with_ids = []
-    for i, node in enumerate(nodes):
-        node_dict = node.dict()
-        if not node_dict.get("id"):
-            node_dict["id"] = node_dict.get("name") or f"node_{i}"
-        node_dict["name"] = node_dict.get("name") or node_dict["id"]
-        nodes_with_ids.append(node_dict)
+    nodes_with_ids = with_node_ids(nodes)
     
     nodes_store.clear()
     nodes_store.extend(nodes_with_ids)
     
     # Try to send nodes to Node.js service, but don't block startup
-    # Use asyncio.create_task to run in background
-    asyncio.create_task(send_nodes_to_nodejs_async(nodes_with_ids, output_schema, combined_prompt))
+    start_background_task(send_nodes_to_nodejs_async(nodes_with_ids, output_schema, combined_prompt))
 
 
 async def send_nodes_to_nodejs_async(nodes_with_ids, output_schema, combined_prompt):
@@ -374,13 +728,16 @@ async def send_nodes_to_nodejs_async(nodes_with_ids, output_schema, combined_pro
     await send_nodes_to_nodejs(nodes_with_ids, output_schema, combined_prompt)
 
 
-# ============================================================================
-# Startup Event
-# ============================================================================
-@app.on_event("startup")
-async def startup_event():
-    """Initialize nodes when server starts"""
-    await initialize_nodes_on_startup()
+def start_background_task(coro) -> asyncio.Task:
+    """
+    Run a coroutine as a background task. The task is kept in app.state.bg_tasks
+    until it finishes (the event loop only holds a weak reference to tasks) and is
+    cancelled at shutdown if it is still running.
+    """
+    task = asyncio.create_task(coro)
+    app.state.bg_tasks.add(task)
+    task.add_done_callback(app.state.bg_tasks.discard)
+    return task
 
 # ============================================================================
 # Root and Health Endpoints
@@ -394,48 +751,80 @@ async def root():
         "version": "1.0.0",
         "node_service_url": NODE_SERVICE_URL,
         "active_nodes": len(nodes_store),
-        "mongodb_connected": db is not None if db else False
+        "mongodb_connected": db is not None
     }
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint (for Overshoot SDK compatibility)"""
-    # Check if Node.js service is reachable
-    node_status = "unknown"
+async def get_node_service_status() -> str:
+    """
+    Check if Node.js service is reachable.
+    The status is cached for HEALTH_TTL_SECONDS so frequent health probes
+    don't each make a request to the Node.js service.
+    """
+    global node_status_cache
+    expires_at, node_status = node_status_cache
+    now = time.monotonic()
+    if now < expires_at:
+        return node_status
+    
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{NODE_SERVICE_URL}/health", timeout=2.0)
-            node_status = "connected" if response.status_code == 200 else "error"
-    except:
+        http_client = get_http_client()
+        response = await http_client.get("/health", timeout=2.0)
+        node_status = "connected" if response.status_code == 200 else "error"
+    except httpx.HTTPError:
         node_status = "disconnected"
     
-    return {
+    node_status_cache = (now + HEALTH_TTL_SECONDS, node_status)
+    return node_status
+
+
+def ping_mongodb() -> bool:
+    """
+    Ping MongoDB, caching the outcome for HEALTH_TTL_SECONDS so frequent
+    health probes don't each make a round trip to the database.
+    """
+    global mongodb_ping_cache
+    expires_at, ping_ok = mongodb_ping_cache
+    now = time.monotonic()
+    if now < expires_at:
+        return ping_ok
+    
+    try:
+        client.admin.command('ping')
+        ping_ok = True
+    except PyMongoError:
+        ping_ok = False
+    
+    mongodb_ping_cache = (now + HEALTH_TTL_SECONDS, ping_ok)
+    return ping_ok
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint (for Overshoot SDK compatibility)"""
+    return FastJSONResponse({
         "status": "ok",
-        "node_service_status": node_status,
+        "node_service_status": await get_node_service_status(),
         "results_count": len(results_store),
-        "mongodb_connected": db is not None if db else False
-    }
+        "mongodb_connected": db is not None
+    }, headers=HEALTH_HEADERS)
 
 
 @app.get("/api/health")
-async def api_health_check():
+def api_health_check():
     """Health check endpoint (for Projects API compatibility)"""
     mongodb_status = "connected" if db is not None else "disconnected"
     
     # Try to ping MongoDB if connected
-    if db:
-        try:
-            client.admin.command('ping')
-        except:
-            mongodb_status = "error"
+    if db is not None and not ping_mongodb():
+        mongodb_status = "error"
     
-    return {
+    return FastJSONResponse({
         "status": "OK",
         "message": "Server is running",
         "mongodb_status": mongodb_status,
         "node_service_url": NODE_SERVICE_URL
-    }
+    }, headers=HEALTH_HEADERS)
 
 # ============================================================================
 # Overshoot SDK / Node System Endpoints
@@ -450,15 +839,18 @@ async def receive_result(result: Result):
     
     CRITICAL: If result contains 'true' values, triggers email alerts based on project nodes
     """
-    # Try to parse as JSON if possible (for structured output)
-    parsed_result = None
+    # Try to parse as JSON if possible (for structured output). Text whose first
+    # non-whitespace character can't start a JSON value is plain text - skip the parse.
+    parsed_result = result.result
     is_json = False
     
-    try:
-        parsed_result = json.loads(result.result)
-        is_json = True
-    except (json.JSONDecodeError, TypeError):
-        parsed_result = result.result
+    stripped = result.result.lstrip(JSON_WHITESPACE)
+    if stripped and stripped[0] in JSON_START_CHARS:
+        try:
+            parsed_result = loads_json(result.result)
+            is_json = True
+        except (json.JSONDecodeError, TypeError):
+            pass
     
     result_data = {
         "result": parsed_result,
@@ -468,14 +860,11 @@ async def receive_result(result: Result):
         "node_id": result.node_id,
         "project_id": result.project_id,  # Store project ID
         "is_json": is_json,
-        "received_at": datetime.now().isoformat()
+        "received_at": iso_timestamp_now()
     }
     
-    results_store.append(result_data)
-    
-    # Keep only last 100 results in memory
-    if len(results_store) > 100:
-        results_store.pop(0)
+    # Only the last RESULTS_STORE_SIZE results are kept - the deque drops the oldest
+    results_store.append(dumps_json(result_data))
     
     # CRITICAL: Check for 'true' values and trigger email alerts
     # Only process if we have a project_id and JSON result
@@ -485,8 +874,8 @@ async def receive_result(result: Result):
             for listener_id, value in parsed_result.items():
                 # Check if value is True (boolean) or "true" (string)
                 if value is True or (isinstance(value, str) and value.lower() == "true"):
-                    print(f"✅ Trigger detected for listener: {listener_id}")
-                    print(f"📋 Debug - video_id: {result.video_id}, project_id: {result.project_id}")
+                    logger.info("✅ Trigger detected for listener: %s", listener_id)
+                    logger.debug("📋 video_id: %s, project_id: %s", result.video_id, result.project_id)
                     
                     project_id_str = result.project_id
                     current_time = datetime.now().timestamp()
@@ -494,7 +883,7 @@ async def receive_result(result: Result):
                     # CRITICAL: Save video clip for ANY detected event (not just email events)
                     # This works for prerecorded videos (video_id provided) or live footage (clip uploaded separately)
                     # BUT: Only save once per event to prevent duplicates (rate limit check)
-                    print(f"🔍 DEBUG: Event detected - video_id={result.video_id}, project_id={result.project_id}, listener_id={listener_id}")
+                    logger.debug("🔍 Event detected - video_id=%s, project_id=%s, listener_id=%s", result.video_id, result.project_id, listener_id)
                     
                     # Check rate limit for clip saving to prevent duplicates
                     clip_saved = False
@@ -509,34 +898,34 @@ async def receive_result(result: Result):
                         
                         if time_since_last_clip < CLIP_RATE_LIMIT_SECONDS:
                             time_remaining = CLIP_RATE_LIMIT_SECONDS - time_since_last_clip
-                            print(f"⏱️ Clip rate limit active for listener {listener_id}: {time_remaining:.1f}s remaining before next clip")
+                            logger.info("⏱️ Clip rate limit active for listener %s: %.1fs remaining before next clip", listener_id, time_remaining)
                         else:
                             # Rate limit passed - proceed with clip extraction
-                            print(f"✅ Clip rate limit passed for listener {listener_id} - proceeding with clip extraction")
+                            logger.info("✅ Clip rate limit passed for listener %s - proceeding with clip extraction", listener_id)
                             
                             try:
                                 project_object_id = ObjectId(result.project_id)
-                                project = db.projects.find_one({"_id": project_object_id})
+                                project = await asyncio.to_thread(db.projects.find_one, {"_id": project_object_id})
                                 
                                 if not project:
-                                    print(f"⚠️ Project {result.project_id} not found in database")
+                                    logger.warning("⚠️ Project %s not found in database", result.project_id)
                                 else:
                                     videos = project.get("videos", [])
-                                    print(f"🔍 DEBUG: Project has {len(videos)} video(s)")
+                                    logger.debug("🔍 Project has %s video(s)", len(videos))
                                     video = next((v for v in videos if v.get("id") == result.video_id), None)
                                     
                                     if not video:
-                                        print(f"⚠️ Video {result.video_id} not found in project. Available IDs: {[v.get('id') for v in videos]}")
+                                        logger.warning("⚠️ Video %s not found in project. Available IDs: %s", result.video_id, [v.get('id') for v in videos])
                                     elif not video.get("filepath"):
-                                        print(f"⚠️ Video {result.video_id} has no filepath")
+                                        logger.warning("⚠️ Video %s has no filepath", result.video_id)
                                     else:
                                         video_path = Path(video["filepath"])
-                                        print(f"🔍 DEBUG: Video filepath: {video_path}")
+                                        logger.debug("🔍 Video filepath: %s", video_path)
                                         
                                         if not video_path.exists():
-                                            print(f"⚠️ Video file does not exist: {video_path}")
+                                            logger.warning("⚠️ Video file does not exist: %s", video_path)
                                         else:
-                                            print(f"📹 Extracting last 5 seconds of video {result.video_id} for event")
+                                            logger.info("📹 Extracting last 5 seconds of video %s for event", result.video_id)
                                             
                                             # Generate unique filename for clip
                                             clip_uuid = str(uuid.uuid4())
@@ -547,20 +936,22 @@ async def receive_result(result: Result):
                                             CLIPS_DIR.mkdir(exist_ok=True)
                                             
                                             # Extract last 5 seconds
-                                            extracted_path = extract_last_n_seconds(
+                                            extracted_path = await asyncio.to_thread(
+                                                extract_last_n_seconds,
                                                 video_path, 
                                                 clip_path, 
                                                 seconds=5
                                             )
                                             
                                             if not extracted_path:
-                                                print(f"⚠️ Failed to extract video clip - extract_last_n_seconds returned None")
+                                                logger.warning("⚠️ Failed to extract video clip - extract_last_n_seconds returned None")
                                             else:
-                                                print(f"✅ Clip extracted: {extracted_path}")
+                                                logger.info("✅ Clip extracted: %s", extracted_path)
                                                 event_type = "event_trigger"
                                                 
                                                 # Save clip to database with event timestamp (from when event was detected)
-                                                clip_id = await save_video_clip_to_database(
+                                                clip_id = await asyncio.to_thread(
+                                                    save_video_clip_to_database,
                                                     project_id=result.project_id,
                                                     listener_id=listener_id,
                                                     event_timestamp=result.timestamp,  # Use event timestamp, not current time
@@ -570,19 +961,17 @@ async def receive_result(result: Result):
                                                 )
                                                 
                                                 if clip_id:
-                                                    print(f"✅ Video clip saved to database: {clip_id} for project {result.project_id} at timestamp {result.timestamp}")
+                                                    logger.info("✅ Video clip saved to database: %s for project %s at timestamp %s", clip_id, result.project_id, result.timestamp)
                                                     clip_saved = True
                                                     # Update rate limit timestamp after successful save
                                                     clip_rate_limit[project_id_str][listener_id] = current_time
-                                                    print(f"⏱️ Clip rate limit updated: next clip for {listener_id} can be saved in {CLIP_RATE_LIMIT_SECONDS}s")
+                                                    logger.info("⏱️ Clip rate limit updated: next clip for %s can be saved in %ss", listener_id, CLIP_RATE_LIMIT_SECONDS)
                                                 else:
-                                                    print(f"⚠️ save_video_clip_to_database returned None")
+                                                    logger.warning("⚠️ save_video_clip_to_database returned None")
                             except Exception as e:
-                                print(f"❌ Error extracting/saving video clip: {e}")
-                                import traceback
-                                traceback.print_exc()
+                                logger.exception("❌ Error extracting/saving video clip: %s", e)
                     else:
-                        print(f"⚠️ No video_id provided - cannot extract clip for prerecorded video")
+                        logger.warning("⚠️ No video_id provided - cannot extract clip for prerecorded video")
                     
                     # CRITICAL: Check rate limit before sending email
                     # Only send if 2 minutes have passed since last email for this listener
@@ -596,19 +985,19 @@ async def receive_result(result: Result):
                     
                     if time_since_last_email < EMAIL_RATE_LIMIT_SECONDS:
                         time_remaining = EMAIL_RATE_LIMIT_SECONDS - time_since_last_email
-                        print(f"⏱️ Rate limit active for listener {listener_id}: {int(time_remaining)}s remaining before next email")
+                        logger.info("⏱️ Rate limit active for listener %s: %ds remaining before next email", listener_id, time_remaining)
                         continue  # Skip email, but clip was already saved above
                     
                     # Rate limit passed - proceed with email
-                    print(f"✅ Rate limit passed for listener {listener_id} - proceeding with email")
+                    logger.info("✅ Rate limit passed for listener %s - proceeding with email", listener_id)
                     
                     # Find project and get nodes
                     try:
                         project_object_id = ObjectId(result.project_id)
-                        project = db.projects.find_one({"_id": project_object_id})
+                        project = await asyncio.to_thread(db.projects.find_one, {"_id": project_object_id})
                         
                         if not project or not project.get("nodes"):
-                            print(f"⚠️ Project {result.project_id} not found or has no nodes")
+                            logger.warning("⚠️ Project %s not found or has no nodes", result.project_id)
                             continue
                         
                         # Find the listener and its associated email events
@@ -627,7 +1016,7 @@ async def receive_result(result: Result):
                                     event_type = event_data.get("event_type", "").lower()
                                     
                                     # Check if this is an email event (Gmail or Email)
-                                    if event_type in ["gmail", "email"]:
+                                    if event_type in EMAIL_EVENT_TYPES:
                                         # Extract email and message from event_data
                                         # Email is stored as "recipient" for Email events, or "email" for Gmail
                                         email = event_data.get("recipient", "") or event_data.get("email", "")
@@ -645,10 +1034,7 @@ async def receive_result(result: Result):
                                         
                                         # Only send if we have an email address
                                         if email:
-                                            print(f"📧 Sending email alert to {email} for listener {listener_id}")
-                                            
-                                            # Import email alert function
-                                            from alerts.email_alert import send_email
+                                            logger.info("📧 Sending email alert to %s for listener %s", email, listener_id)
                                             
                                             # Get listener name for subject
                                             listener_name = listener.get("listener_data", {}).get("name", "Detection")
@@ -663,7 +1049,7 @@ async def receive_result(result: Result):
                                                 with open(boilerplate_path, "r", encoding="utf-8") as f:
                                                     boilerplate_template = f.read()
                                             except Exception as e:
-                                                print(f"⚠️ Could not read boilerplate template: {e}")
+                                                logger.warning("⚠️ Could not read boilerplate template: %s", e)
                                                 # Fallback template
                                                 boilerplate_template = """Hello,
 
@@ -707,26 +1093,28 @@ This email was sent automatically. Please do not reply."""
                                                 )
                                             
                                             # Send email with formatted message
-                                            email_result = send_email(
+                                            email_result = await asyncio.to_thread(
+                                                send_email,
                                                 recipient_email=email,
                                                 subject=f"Alert: {listener_name}",
                                                 message=formatted_message
                                             )
                                             
                                             if email_result.get("success"):
-                                                print(f"✅ Email sent successfully to {email}")
+                                                logger.info("✅ Email sent successfully to %s", email)
                                                 email_sent = True
                                                 
                                                 # CRITICAL: Update rate limit timestamp after successful send
                                                 email_rate_limit[project_id_str][listener_id] = current_time
-                                                print(f"⏱️ Rate limit updated: next email for {listener_id} can be sent in {EMAIL_RATE_LIMIT_SECONDS}s")
+                                                logger.info("⏱️ Rate limit updated: next email for %s can be sent in %ss", listener_id, EMAIL_RATE_LIMIT_SECONDS)
                                                 
                                                 # Update clip event type to email_alert if clip was already saved
                                                 # (Video clips are saved for ANY event above, but we update type for email events)
-                                                if result.video_id and db:
+                                                if result.video_id and db is not None:
                                                     try:
                                                         # Find and update the most recent clip for this event
-                                                        db.video_clips.update_one(
+                                                        await asyncio.to_thread(
+                                                            db.video_clips.update_one,
                                                             {
                                                                 "projectId": result.project_id,
                                                                 "listenerId": listener_id,
@@ -740,28 +1128,28 @@ This email was sent automatically. Please do not reply."""
                                                             }
                                                         )
                                                     except Exception as e:
-                                                        print(f"⚠️ Could not update clip event type: {e}")
+                                                        logger.warning("⚠️ Could not update clip event type: %s", e)
                                             else:
-                                                print(f"❌ Failed to send email: {email_result.get('error')}")
+                                                logger.error("❌ Failed to send email: %s", email_result.get('error'))
                                         else:
-                                            print(f"⚠️ Email event found but no email address configured for listener {listener_id}")
+                                            logger.warning("⚠️ Email event found but no email address configured for listener %s", listener_id)
                                 
                                 # Only break if we found the listener (email sent or no email configured)
                                 break  # Found the listener, no need to continue
                     
                     except (InvalidId, ValueError) as e:
-                        print(f"⚠️ Invalid project ID: {result.project_id} - {e}")
+                        logger.warning("⚠️ Invalid project ID: %s - %s", result.project_id, e)
                     except Exception as e:
-                        print(f"❌ Error processing alert for listener {listener_id}: {e}")
+                        logger.error("❌ Error processing alert for listener %s: %s", listener_id, e)
         
         except Exception as e:
-            print(f"❌ Error checking for triggers: {e}")
+            logger.error("❌ Error checking for triggers: %s", e)
     
     # Quick log for performance
     if is_json:
-        print(f"📹 Result: {len(parsed_result) if isinstance(parsed_result, dict) else 1} fields")
+        logger.info("📹 Result: %s fields", len(parsed_result) if isinstance(parsed_result, dict) else 1)
     else:
-        print(f"📹 Result received")
+        logger.info("📹 Result received")
     
     return {"success": True, "message": "Result received"}
 
@@ -769,10 +1157,12 @@ This email was sent automatically. Please do not reply."""
 @app.get("/api/results")
 async def get_results(limit: int = 10):
     """Get recent results"""
-    return {
-        "results": results_store[-limit:],
-        "total": len(results_store)
-    }
+    # results_store holds encoded results, so the response body is assembled directly.
+    # Same entries as list(results_store)[-limit:], without copying the whole deque first.
+    total = len(results_store)
+    start = slice(-limit, None).indices(total)[0]
+    body = b'{"results":[%s],"total":%d}' % (b",".join(islice(results_store, start, None)), total)
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/api/nodes")
@@ -785,36 +1175,29 @@ async def update_nodes(nodes_update: NodesUpdate):
         raise HTTPException(status_code=400, detail="At least one node is required")
     
     # Store nodes with IDs
-    nodes_with_ids = []
-    for i, node in enumerate(nodes_update.nodes):
-        node_dict = node.dict()
-        if not node_dict.get("id"):
-            node_dict["id"] = node_dict.get("name") or f"node_{i}"
-        node_dict["name"] = node_dict.get("name") or node_dict["id"]
-        nodes_with_ids.append(node_dict)
+    nodes_with_ids = with_node_ids([node.model_dump() for node in nodes_update.nodes])
     
     nodes_store.clear()
     nodes_store.extend(nodes_with_ids)
     
     # Convert to outputSchema
-    output_schema = convert_nodes_to_output_schema([Node(**n) for n in nodes_with_ids])
-    combined_prompt = create_combined_prompt([Node(**n) for n in nodes_with_ids])
+    output_schema, combined_prompt = get_nodes_config()
     
     # Try to send to Node.js service (optional - frontend can use nodes directly)
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NODE_SERVICE_URL}/api/nodes",
-                json={
-                    "nodes": nodes_with_ids,
-                    "outputSchema": output_schema,
-                    "prompt": combined_prompt
-                },
-                timeout=2.0  # Short timeout since Node.js service is optional
-            )
-            response.raise_for_status()
-            print("✅ Nodes sent to Node.js service (if running)")
-    except:
+        http_client = get_http_client()
+        response = await http_client.post(
+            "/api/nodes",
+            json={
+                "nodes": nodes_with_ids,
+                "outputSchema": output_schema,
+                "prompt": combined_prompt
+            },
+            timeout=2.0  # Short timeout since Node.js service is optional
+        )
+        response.raise_for_status()
+        print("✅ Nodes sent to Node.js service (if running)")
+    except httpx.HTTPError:
         # Node.js service is optional - frontend will use nodes directly
         pass
     
@@ -832,30 +1215,12 @@ async def get_nodes():
     """Get current nodes configuration"""
     # If nodes_store is empty, reload from file
     if not nodes_store:
-        nodes, output_schema, combined_prompt = load_nodes_from_file()
-        nodes_with_ids = []
-        for i, node in enumerate(nodes):
-            node_dict = node.dict()
-            if not node_dict.get("id"):
-                node_dict["id"] = node_dict.get("name") or f"node_{i}"
-            node_dict["name"] = node_dict.get("name") or node_dict["id"]
-            nodes_with_ids.append(node_dict)
+        nodes, output_schema, combined_prompt = await load_nodes_from_file()
+        nodes_with_ids = with_node_ids(nodes)
         nodes_store.extend(nodes_with_ids)
     
-    # Generate schema and prompt for response
-    if nodes_store:
-        output_schema = convert_nodes_to_output_schema([Node(**n) for n in nodes_store])
-        combined_prompt = create_combined_prompt([Node(**n) for n in nodes_store])
-    else:
-        output_schema = {}
-        combined_prompt = DEFAULT_PROMPT
-    
-    return {
-        "nodes": nodes_store,
-        "count": len(nodes_store),
-        "outputSchema": output_schema,
-        "prompt": combined_prompt
-    }
+    # Response body is encoded once and cached until the nodes change
+    return Response(content=get_nodes_body(), media_type="application/json")
 
 
 @app.get("/api/overshoot/config")
@@ -871,41 +1236,35 @@ async def get_overshoot_config():
 @app.post("/api/nodes/reload")
 async def reload_nodes():
     """Reload nodes from sample_nodes.json file"""
-    nodes, output_schema, combined_prompt = load_nodes_from_file()
+    nodes, output_schema, combined_prompt = await load_nodes_from_file()
     
     # Store nodes with IDs
-    nodes_with_ids = []
-    for i, node in enumerate(nodes):
-        node_dict = node.dict()
-        if not node_dict.get("id"):
-            node_dict["id"] = node_dict.get("name") or f"node_{i}"
-        node_dict["name"] = node_dict.get("name") or node_dict["id"]
-        nodes_with_ids.append(node_dict)
+    nodes_with_ids = with_node_ids(nodes)
     
     nodes_store.clear()
     nodes_store.extend(nodes_with_ids)
     
     # Send to Node.js service
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NODE_SERVICE_URL}/api/nodes",
-                json={
-                    "nodes": nodes_with_ids,
-                    "outputSchema": output_schema,
-                    "prompt": combined_prompt
-                },
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return {
-                "success": True,
-                "message": "Nodes reloaded successfully",
+        http_client = get_http_client()
+        response = await http_client.post(
+            "/api/nodes",
+            json={
                 "nodes": nodes_with_ids,
-                "count": len(nodes_with_ids),
                 "outputSchema": output_schema,
                 "prompt": combined_prompt
-            }
+            },
+            timeout=10.0
+        )
+        response.raise_for_status()
+        return {
+            "success": True,
+            "message": "Nodes reloaded successfully",
+            "nodes": nodes_with_ids,
+            "count": len(nodes_with_ids),
+            "outputSchema": output_schema,
+            "prompt": combined_prompt
+        }
     except httpx.RequestError as e:
         return {
             "success": True,
@@ -925,14 +1284,14 @@ async def clear_nodes():
     """Clear all nodes configuration"""
     nodes_store.clear()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NODE_SERVICE_URL}/api/nodes",
-                json={"nodes": [], "outputSchema": {}, "prompt": ""},
-                timeout=10.0
-            )
-            response.raise_for_status()
-    except:
+        http_client = get_http_client()
+        response = await http_client.post(
+            "/api/nodes",
+            json={"nodes": [], "outputSchema": {}, "prompt": ""},
+            timeout=10.0
+        )
+        response.raise_for_status()
+    except httpx.HTTPError:
         pass  # Ignore errors if Node.js service is not available
     
     return {"success": True, "message": "Nodes cleared"}
@@ -945,14 +1304,14 @@ async def update_prompt(prompt_update: PromptUpdate):
     This updates what the vision service should detect
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NODE_SERVICE_URL}/api/prompt",
-                json={"prompt": prompt_update.prompt},
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return response.json()
+        http_client = get_http_client()
+        response = await http_client.post(
+            "/api/prompt",
+            json={"prompt": prompt_update.prompt},
+            timeout=10.0
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Failed to connect to Node.js service: {str(e)}")
     except httpx.HTTPStatusError as e:
@@ -968,13 +1327,13 @@ async def control_service(control: ServiceControl):
         raise HTTPException(status_code=400, detail="Action must be 'start' or 'stop'")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NODE_SERVICE_URL}/api/{control.action}",
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return response.json()
+        http_client = get_http_client()
+        response = await http_client.post(
+            f"/api/{control.action}",
+            timeout=10.0
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Failed to connect to Node.js service: {str(e)}")
     except httpx.HTTPStatusError as e:
@@ -1005,7 +1364,7 @@ async def parse_prompt_endpoint(request: Request):
         
         # Parse the prompt using Gemini AI
         print(f"\n🤖 Parsing prompt with AI: {user_prompt[:100]}...")
-        parsed_data = parse_prompt(user_prompt)
+        parsed_data = await parse_prompt_async(user_prompt)
         
         # Convert to export format (ensures proper structure)
         export_data = convert_to_export_format(parsed_data)
@@ -1041,7 +1400,6 @@ async def parse_prompt_endpoint(request: Request):
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"❌ Error parsing prompt: {e}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(
             status_code=500, 
@@ -1052,8 +1410,19 @@ async def parse_prompt_endpoint(request: Request):
 # Project Management Endpoints
 # ============================================================================
 
+# Fields of a project document returned by the project list (_id is included by default)
+PROJECT_LIST_PROJECTION = {
+    "userId": 1,
+    "name": 1,
+    "thumbnailPath": 1,
+    "thumbnailFilename": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+}
+
+
 @app.get("/api/projects", response_model=List[Project])
-async def get_projects(userId: str = Header(None, alias="X-User-Id")):
+def get_projects(userId: str = Header(None, alias="X-User-Id")):
     """Get all projects for the authenticated user"""
     if not userId:
         raise HTTPException(status_code=401, detail="Unauthorized: User ID required")
@@ -1061,10 +1430,13 @@ async def get_projects(userId: str = Header(None, alias="X-User-Id")):
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    projects = db.projects.find({"userId": userId}).sort("createdAt", -1)
-    result = []
-    for project in projects:
-        result.append({
+    # Only fetch the fields the list returns - videos and nodes can be large
+    projects = db.projects.find(
+        {"userId": userId},
+        projection=PROJECT_LIST_PROJECTION,
+    ).sort("createdAt", -1).batch_size(100)
+    return [
+        {
             "id": str(project["_id"]),
             "userId": project["userId"],
             "name": project["name"],
@@ -1072,12 +1444,13 @@ async def get_projects(userId: str = Header(None, alias="X-User-Id")):
             "thumbnailFilename": project.get("thumbnailFilename"),
             "createdAt": project["createdAt"],
             "updatedAt": project["updatedAt"],
-        })
-    return result
+        }
+        for project in projects
+    ]
 
 
 @app.post("/api/projects", response_model=Project, status_code=201)
-async def create_project(project_data: ProjectCreate, userId: str = Header(None, alias="X-User-Id")):
+def create_project(project_data: ProjectCreate, userId: str = Header(None, alias="X-User-Id")):
     """Create a new project"""
     if not userId:
         raise HTTPException(status_code=401, detail="Unauthorized: User ID required")
@@ -1113,7 +1486,7 @@ async def create_project(project_data: ProjectCreate, userId: str = Header(None,
 
 
 @app.get("/api/projects/{project_id}", response_model=Project)
-async def get_project(project_id: str, userId: str = Header(None, alias="X-User-Id")):
+def get_project(project_id: str, userId: str = Header(None, alias="X-User-Id")):
     """Get a specific project"""
     if not userId:
         raise HTTPException(status_code=401, detail="Unauthorized: User ID required")
@@ -1121,10 +1494,7 @@ async def get_project(project_id: str, userId: str = Header(None, alias="X-User-
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     project = db.projects.find_one({"_id": object_id, "userId": userId})
     if not project:
@@ -1151,7 +1521,7 @@ async def get_project(project_id: str, userId: str = Header(None, alias="X-User-
 
 
 @app.put("/api/projects/{project_id}", response_model=Project)
-async def update_project(project_id: str, project_data: ProjectUpdate, userId: str = Header(None, alias="X-User-Id")):
+def update_project(project_id: str, project_data: ProjectUpdate, userId: str = Header(None, alias="X-User-Id")):
     """Update a project"""
     if not userId:
         raise HTTPException(status_code=401, detail="Unauthorized: User ID required")
@@ -1159,10 +1529,7 @@ async def update_project(project_id: str, project_data: ProjectUpdate, userId: s
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     update_data = {
         "name": project_data.name.strip(),
@@ -1193,7 +1560,7 @@ async def update_project(project_id: str, project_data: ProjectUpdate, userId: s
 
 
 @app.delete("/api/projects/{project_id}")
-async def delete_project(project_id: str, userId: str = Header(None, alias="X-User-Id")):
+def delete_project(project_id: str, userId: str = Header(None, alias="X-User-Id")):
     """Delete a project"""
     if not userId:
         raise HTTPException(status_code=401, detail="Unauthorized: User ID required")
@@ -1201,10 +1568,7 @@ async def delete_project(project_id: str, userId: str = Header(None, alias="X-Us
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     try:
         result = db.projects.find_one_and_delete({"_id": object_id, "userId": userId})
@@ -1270,7 +1634,7 @@ def generate_thumbnail(video_path: Path, thumbnail_path: Path, thumbnail_size: t
         return False
 
 
-async def save_video_clip_to_database(
+def save_video_clip_to_database(
     project_id: str,
     listener_id: str,
     event_timestamp: str,
@@ -1346,7 +1710,6 @@ async def save_video_clip_to_database(
         
     except Exception as e:
         print(f"❌ Error saving video clip to database: {e}")
-        import traceback
         traceback.print_exc()
         return None
 
@@ -1464,7 +1827,6 @@ def extract_last_n_seconds(video_path: Path, output_path: Path, seconds: int = 5
         out.release()
         
         # Wait a moment for file system to flush
-        import time
         time.sleep(0.1)
         
         # Verify output file was created
@@ -1482,7 +1844,6 @@ def extract_last_n_seconds(video_path: Path, output_path: Path, seconds: int = 5
             
     except Exception as e:
         print(f"❌ Error extracting video clip: {e}")
-        import traceback
         traceback.print_exc()
         return None
     finally:
@@ -1500,7 +1861,7 @@ def extract_last_n_seconds(video_path: Path, output_path: Path, seconds: int = 5
 
 
 @app.post("/api/projects/{project_id}/videos")
-async def upload_video(
+def upload_video(
     project_id: str,
     file: UploadFile = File(...),
     userId: str = Header(None, alias="X-User-Id")
@@ -1516,10 +1877,7 @@ async def upload_video(
     if not file.content_type or not file.content_type.startswith("video/"):
         raise HTTPException(status_code=400, detail="File must be a video")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     # Verify project exists and belongs to user
     project = db.projects.find_one({"_id": object_id, "userId": userId})
@@ -1592,7 +1950,7 @@ async def upload_video(
 
 
 @app.get("/api/projects/{project_id}/videos/{video_id}/file")
-async def get_video_file(
+def get_video_file(
     project_id: str,
     video_id: str,
     request: Request,
@@ -1608,10 +1966,7 @@ async def get_video_file(
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     # Verify project exists and belongs to user
     project = db.projects.find_one({"_id": object_id, "userId": userId})
@@ -1649,7 +2004,7 @@ async def get_video_file(
 
 
 @app.get("/api/projects/{project_id}/clips/{clip_id}/file")
-async def get_clip_file(
+def get_clip_file(
     project_id: str,
     clip_id: str,
     request: Request,
@@ -1665,10 +2020,7 @@ async def get_clip_file(
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     # Verify project exists and belongs to user
     project = db.projects.find_one({"_id": object_id, "userId": userId})
@@ -1703,7 +2055,7 @@ async def get_clip_file(
 
 
 @app.get("/api/projects/{project_id}/thumbnail")
-async def get_project_thumbnail(
+def get_project_thumbnail(
     project_id: str,
     request: Request,
     userId: Optional[str] = Header(None, alias="X-User-Id"),
@@ -1718,10 +2070,7 @@ async def get_project_thumbnail(
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     # Verify project exists and belongs to user
     project = db.projects.find_one({"_id": object_id, "userId": userId})
@@ -1758,7 +2107,7 @@ async def get_project_thumbnail(
 
 
 @app.post("/api/projects/{project_id}/thumbnail")
-async def upload_project_thumbnail(
+def upload_project_thumbnail(
     project_id: str,
     file: UploadFile = File(...),
     userId: str = Header(None, alias="X-User-Id")
@@ -1774,10 +2123,7 @@ async def upload_project_thumbnail(
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     # Verify project exists and belongs to user
     project = db.projects.find_one({"_id": object_id, "userId": userId})
@@ -1797,7 +2143,7 @@ async def upload_project_thumbnail(
     # Save file to disk
     try:
         # Read file content into memory
-        file_content = await file.read()
+        file_content = file.file.read()
         
         # Open image from bytes
         image = Image.open(BytesIO(file_content))
@@ -1860,7 +2206,7 @@ async def upload_project_thumbnail(
 
 
 @app.get("/api/projects/{project_id}/prompt")
-async def get_project_prompt(
+def get_project_prompt(
     project_id: str,
     userId: str = Header(None, alias="X-User-Id")
 ):
@@ -1871,10 +2217,7 @@ async def get_project_prompt(
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     # Verify project exists and belongs to user
     project = db.projects.find_one({"_id": object_id, "userId": userId})
@@ -1952,7 +2295,6 @@ async def get_project_prompt(
         }
     except Exception as e:
         print(f"Error processing nodes to prompt: {e}")
-        import traceback
         traceback.print_exc()
         # Return default prompt on error
         return {
@@ -1965,7 +2307,7 @@ async def get_project_prompt(
 
 
 @app.put("/api/projects/{project_id}/nodes")
-async def save_project_nodes(
+def save_project_nodes(
     project_id: str,
     nodes_data: Dict[str, Any],
     userId: str = Header(None, alias="X-User-Id")
@@ -1977,10 +2319,7 @@ async def save_project_nodes(
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     # Verify project exists and belongs to user
     project = db.projects.find_one({"_id": object_id, "userId": userId})
@@ -2006,7 +2345,7 @@ async def save_project_nodes(
 
 
 @app.get("/api/projects/{project_id}/analytics")
-async def get_project_analytics(
+def get_project_analytics(
     project_id: str,
     userId: str = Header(None, alias="X-User-Id")
 ):
@@ -2017,10 +2356,7 @@ async def get_project_analytics(
     if db is None:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
     
-    try:
-        object_id = ObjectId(project_id)
-    except (InvalidId, ValueError):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
+    object_id = parse_object_id(project_id)
     
     # Verify project exists and belongs to user
     project = db.projects.find_one({"_id": object_id, "userId": userId})
@@ -2086,7 +2422,6 @@ async def get_project_analytics(
             })
     except Exception as e:
         print(f"Error fetching video clips: {e}")
-        import traceback
         traceback.print_exc()
     
     # Sort all events by timestamp (most recent first)
@@ -2103,6 +2438,15 @@ async def get_project_analytics(
 # Main Entry Point
 # ============================================================================
 if __name__ == "__main__":
-    import uvicorn
     port = int(os.getenv("PORT", 3001))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Worker processes (WEB_CONCURRENCY, default 1). Results, nodes and rate limits are
+    # kept in memory per process, so each worker has its own copy of that state.
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+    uvicorn.run(
+        "main:app" if workers > 1 else app,  # multiple workers need an import string
+        host="0.0.0.0",
+        port=port,
+        loop="auto",  # uvloop when installed (uvicorn[standard])
+        http="auto",  # httptools when installed (uvicorn[standard])
+        workers=workers,
+    )
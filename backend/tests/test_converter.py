@@ -0,0 +1,44 @@
+"""
+Tests for converting prompt parser output to the UserNodes export format
+"""
+import pytest
+
+from Nodes.nodes_assistant.converter import convert_to_export_format
+
+
+def make_listener(listener_data):
+    """Build a listener that is otherwise complete"""
+    return {
+        "listener_id": "listener-1",
+        "listener_data": listener_data,
+        "conditions": [],
+        "events": [],
+        "accessories": []
+    }
+
+
+def test_null_listener_type_corrected_to_custom():
+    """Test a null listener_type is corrected to 'custom'"""
+    parsed = {"listeners": [make_listener({"listener_type": None, "description": ""})]}
+    
+    result = convert_to_export_format(parsed)
+    
+    assert result["listeners"][0]["listener_data"]["listener_type"] == "custom"
+
+
+def test_invalid_listener_type_corrected_to_custom():
+    """Test an unknown listener_type is corrected to 'custom'"""
+    parsed = {"listeners": [make_listener({"listener_type": "not-a-type", "description": ""})]}
+    
+    result = convert_to_export_format(parsed)
+    
+    assert result["listeners"][0]["listener_data"]["listener_type"] == "custom"
+
+
+def test_missing_listener_type_left_out():
+    """Test a listener without a listener_type key is left without one"""
+    parsed = {"listeners": [make_listener({"description": ""})]}
+    
+    result = convert_to_export_format(parsed)
+    
+    assert "listener_type" not in result["listeners"][0]["listener_data"]
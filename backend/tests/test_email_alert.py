@@ -0,0 +1,74 @@
+"""
+Tests for queued email alerts
+"""
+import smtplib
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from alerts import email_alert
+
+
+@pytest.fixture
+def mock_smtp(monkeypatch):
+    """Mock smtplib.SMTP with sender credentials set and no shared connection open"""
+    monkeypatch.setattr(email_alert, "SENDER_EMAIL", "sender@example.com")
+    monkeypatch.setattr(email_alert, "SENDER_PASSWORD", "password")
+    email_alert.close_connection()
+    with patch("alerts.email_alert.smtplib.SMTP") as smtp:
+        smtp.return_value.noop.return_value = (250, b"OK")
+        yield smtp
+    email_alert.close_connection()
+
+
+def test_drain_sends_queued_emails_before_closing(mock_smtp):
+    """Test drain() waits for every queued email, then closes the connection"""
+    server = mock_smtp.return_value
+    release = threading.Event()
+    sent = []
+    
+    def send_message(msg):
+        # Hold the sender so the emails are still queued when drain() is called
+        release.wait(5)
+        sent.append(msg["To"])
+    
+    server.send_message.side_effect = send_message
+    futures = [email_alert.send_email(f"user{i}@example.com", "Alert", "Motion", sync=False)
+               for i in range(3)]
+    
+    threading.Timer(0.05, release.set).start()
+    email_alert.drain()
+    
+    assert all(future.done() for future in futures)
+    assert all(future.result()["success"] for future in futures)
+    assert sent == ["user0@example.com", "user1@example.com", "user2@example.com"]
+    server.quit.assert_called_once()
+    assert email_alert._pending == set()
+
+
+def test_failed_retry_drops_connection(mock_smtp):
+    """Test a retry that also fails resets the shared connection instead of keeping it"""
+    server = mock_smtp.return_value
+    server.send_message.side_effect = [smtplib.SMTPServerDisconnected("idle"),
+                                       smtplib.SMTPException("still down")]
+    
+    result = email_alert.send_email("user@example.com", "Alert", "Motion")
+    
+    assert result["success"] is False
+    assert email_alert._smtp_conn is None
+    server.close.assert_called()
+
+
+def test_drain_logs_unsent_emails(mock_smtp, caplog):
+    """Test drain() logs a warning for emails still queued when the timeout runs out"""
+    release = threading.Event()
+    mock_smtp.return_value.send_message.side_effect = lambda msg: release.wait(5)
+    future = email_alert.send_email("user@example.com", "Alert", "Motion", sync=False)
+    
+    # Let the send finish after the timeout, so drain() can close the connection
+    threading.Timer(0.2, release.set).start()
+    email_alert.drain(timeout=0.05)
+    
+    assert "1 queued email(s) not sent before exit" in caplog.text
+    future.result(timeout=5)
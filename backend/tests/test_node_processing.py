@@ -0,0 +1,50 @@
+"""
+Tests for converting listener nodes into prompt strings
+"""
+import pytest
+
+from Nodes import node_processing
+from Nodes.node_processing import process_listeners
+
+
+def test_null_and_missing_types_use_default_goal():
+    """Test listeners with null or missing types fall back like an empty type"""
+    listeners = {
+        "listeners": [
+            {"listener_id": "a", "listener_data": {"listener_type": None},
+             "conditions": [{"condition_data": {"condition_type": None}}]},
+            {"listener_id": "b", "listener_data": {},
+             "conditions": [{"condition_data": {}}]},
+        ]
+    }
+    
+    result = process_listeners(listeners)
+    
+    assert [node["name"] for node in result["nodes"]] == ["a", "b"]
+    for node in result["nodes"]:
+        assert node["prompt"] == "if relevant objects or events detected return true, otherwise false"
+
+
+def test_types_used_when_no_description():
+    """Test listener and condition types are used when descriptions are empty"""
+    listeners = {
+        "listeners": [
+            {"listener_id": "a", "listener_data": {"listener_type": "Motion"},
+             "conditions": [{"condition_data": {"condition_type": "time"}},
+                            {"condition_data": {"condition_type": None}}]},
+        ]
+    }
+    
+    result = process_listeners(listeners)
+    
+    assert result["nodes"][0]["prompt"] == "if motion return true, otherwise false. Conditions: time"
+
+
+def test_clear_cache_drops_memoized_results():
+    """Test clear_cache() empties the process_listeners() cache"""
+    process_listeners({"listeners": [{"listener_id": "a", "listener_data": {"description": "person"}}]})
+    assert node_processing._process_listeners_cached.cache_info().currsize > 0
+    
+    node_processing.clear_cache()
+    
+    assert node_processing._process_listeners_cached.cache_info().currsize == 0
@@ -0,0 +1,191 @@
+"""
+Tests for the UserNodes log - replay, tombstones, compaction and torn-tail recovery
+"""
+import gc
+import os
+import weakref
+
+import pytest
+
+from Nodes.user_nodes import UserNodes, LOG_FILENAME
+
+
+@pytest.fixture
+def storage_path(tmp_path):
+    """Empty node storage directory"""
+    return str(tmp_path / "node_data")
+
+
+def reopen(user_nodes):
+    """Close a UserNodes and load a fresh one from the same path"""
+    user_nodes.close()
+    return UserNodes(storage_path=user_nodes.storage_path)
+
+
+def test_replay_restores_nodes_and_links(storage_path):
+    """Test nodes and links saved to the log are restored by a fresh instance"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    condition = user_nodes.create_condition({"name": "night"})
+    listener = user_nodes.create_listener({"name": "door"})
+    user_nodes.link_condition_to_listener(condition.node_id, listener.node_id)
+    
+    restored = reopen(user_nodes)
+    
+    assert restored.get_node(condition.node_id).data == {"name": "night"}
+    assert list(restored.get_node(condition.node_id).next_nodes) == [listener.node_id]
+    assert restored.get_node(listener.node_id).data == {"name": "door"}
+    restored.close()
+
+
+def test_tombstone_removes_node_and_pointers(storage_path):
+    """Test a deleted node stays deleted after replay and is unlinked from its parents"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    condition = user_nodes.create_condition()
+    listener = user_nodes.create_listener()
+    user_nodes.link_condition_to_listener(condition.node_id, listener.node_id)
+    user_nodes.delete_node(listener.node_id)
+    
+    restored = reopen(user_nodes)
+    
+    assert restored.get_node(listener.node_id) is None
+    assert list(restored.get_node(condition.node_id).next_nodes) == []
+    restored.close()
+
+
+def test_compact_writes_snapshot_and_removes_log(storage_path):
+    """Test compaction folds the log into snapshot files and drops deleted nodes"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    kept = user_nodes.create_event({"name": "email"})
+    deleted = user_nodes.create_event({"name": "sms"})
+    user_nodes.compact()
+    user_nodes.delete_node(deleted.node_id)
+    user_nodes.compact()
+    
+    assert not os.path.exists(os.path.join(storage_path, LOG_FILENAME))
+    assert os.path.exists(os.path.join(storage_path, f"{kept.node_id}.json"))
+    assert not os.path.exists(os.path.join(storage_path, f"{deleted.node_id}.json"))
+    
+    restored = reopen(user_nodes)
+    assert restored.get_node(kept.node_id).data == {"name": "email"}
+    assert restored.get_node(deleted.node_id) is None
+    restored.close()
+
+
+def test_torn_tail_is_truncated_before_new_appends(storage_path, caplog):
+    """Test a torn final record is cut off so records appended after it are not lost"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    first = user_nodes.create_condition({"name": "first"})
+    user_nodes.close()
+    log_path = os.path.join(storage_path, LOG_FILENAME)
+    good_size = os.path.getsize(log_path)
+    with open(log_path, "ab") as f:
+        f.write(b'{"op":"upsert","node":{"node_id":')
+    
+    recovered = UserNodes(storage_path=storage_path)
+    assert os.path.getsize(log_path) == good_size
+    assert f"Dropping unreadable record at byte {good_size}" in caplog.text
+    second = recovered.create_condition({"name": "second"})
+    
+    restored = reopen(recovered)
+    assert restored.get_node(first.node_id).data == {"name": "first"}
+    assert restored.get_node(second.node_id).data == {"name": "second"}
+    restored.close()
+
+
+@pytest.mark.parametrize("make_durable", ["flush", "commit"])
+def test_saved_node_visible_to_fresh_instance(storage_path, make_durable):
+    """Test flush() and commit() make a save visible without closing the store"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    event = user_nodes.create_event({"name": "email"})
+    getattr(user_nodes, make_durable)()
+    
+    fresh = UserNodes(storage_path=storage_path)
+    
+    assert fresh.get_node(event.node_id).data == {"name": "email"}
+    fresh.close()
+    user_nodes.close()
+
+
+def test_unreferenced_store_is_collected_and_closed(storage_path):
+    """Test a dropped store is garbage collected and its queued records still reach the log"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    event = user_nodes.create_event({"name": "email"})
+    ref = weakref.ref(user_nodes)
+    
+    del user_nodes
+    gc.collect()
+    
+    assert ref() is None
+    fresh = UserNodes(storage_path=storage_path)
+    assert fresh.get_node(event.node_id).data == {"name": "email"}
+    fresh.close()
+
+
+def test_compact_rewrites_only_changed_snapshots(storage_path):
+    """Test compaction leaves snapshot files of unchanged nodes alone"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    changed = user_nodes.create_event({"name": "email"})
+    unchanged = user_nodes.create_event({"name": "sms"})
+    user_nodes.compact()
+    unchanged_path = os.path.join(storage_path, f"{unchanged.node_id}.json")
+    unchanged_inode = os.stat(unchanged_path).st_ino
+    
+    changed.data["name"] = "gmail"
+    user_nodes.save_node(changed.node_id)
+    user_nodes.compact()
+    
+    assert os.stat(unchanged_path).st_ino == unchanged_inode
+    assert not [name for name in os.listdir(storage_path) if name.endswith(".tmp")]
+    restored = reopen(user_nodes)
+    assert restored.get_node(changed.node_id).data == {"name": "gmail"}
+    assert restored.get_node(unchanged.node_id).data == {"name": "sms"}
+    restored.close()
+
+
+def test_compact_drops_snapshot_pointers_to_deleted_nodes(storage_path):
+    """Test a parent compacted before its child was deleted loses the pointer on the next compaction"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    condition = user_nodes.create_condition()
+    listener = user_nodes.create_listener()
+    user_nodes.link_condition_to_listener(condition.node_id, listener.node_id)
+    user_nodes.compact()
+    
+    restored = reopen(user_nodes)  # Parent snapshot is not cached here
+    restored.delete_node(listener.node_id)
+    restored.compact()
+    
+    fresh = reopen(restored)
+    assert list(fresh.get_node(condition.node_id).next_nodes) == []
+    fresh.close()
+
+
+def test_delete_unlinks_pointer_added_directly(storage_path):
+    """Test a pointer added with add_listener() and saved is dropped when its target is deleted"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    condition = user_nodes.create_condition()
+    listener = user_nodes.create_listener()
+    condition.add_listener(listener.node_id)
+    user_nodes.save_node(condition.node_id)
+    
+    user_nodes.delete_node(listener.node_id)
+    
+    assert list(condition.next_nodes) == []
+    restored = reopen(user_nodes)
+    assert list(restored.get_node(condition.node_id).next_nodes) == []
+    restored.close()
+
+
+def test_delete_after_pointer_removed_directly(storage_path):
+    """Test deleting a node its former parent dropped with remove_next_node() leaves the parent alone"""
+    user_nodes = UserNodes(storage_path=storage_path)
+    condition = user_nodes.create_condition()
+    listener = user_nodes.create_listener()
+    user_nodes.link_condition_to_listener(condition.node_id, listener.node_id)
+    condition.remove_next_node(listener.node_id)
+    user_nodes.save_node(condition.node_id)
+    user_nodes.delete_node(condition.node_id)
+    
+    user_nodes.delete_node(listener.node_id)
+    
+    assert user_nodes.get_all_nodes() == {}
+    user_nodes.close()